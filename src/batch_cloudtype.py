@@ -0,0 +1,267 @@
+"""
+Name: batch_cloudtype
+Description: Wrapper program to calculate mass eruption rate (MER) for many volcanic
+ clouds in one run, each from its own input file.
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+
+Use:
+ > python batch_cloudtype.py <input directory or manifest> [-o <results directory>] [-j <workers>]
+       [--cache <cache directory>] [-q]
+
+ A directory is searched for .ssv, .csv and .tsv input files. A start file
+ for an input file <name>.ssv is used if <name>_start.txt is found next to it.
+
+ A manifest is a text file with one eruption per line: the input file and,
+ optionally, its start file, separated by white space. Relative paths are
+ taken from the directory of the manifest. Lines starting with # are skipped.
+
+ The results for each eruption are written to a directory of their own,
+ named after the input file, in the results directory.
+
+ Eruptions are spread over a pool of worker processes, by default one per
+ core; -j 1 runs them one after the other in this process. An eruption
+ that fails is reported at the end, and does not stop the others.
+
+ With --cache, parsed input files are kept in binary form in the cache
+ directory (see get_info_cached), so that re-runs skip the text parsing.
+
+ With -q, the messages of the MER modules for each image, and their
+ summaries, are not written (see mer_logging).
+"""
+
+# Import python libraries
+import sys,os
+import argparse
+import multiprocessing
+import traceback
+import matplotlib
+matplotlib.use('Agg')       # no display needed; figures are saved to file
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Import modules in the src directory
+from get_MERs_cloudtype import *
+from get_N import *
+from get_info_from_txt import *
+from get_info_cached import *
+from get_rhos import *
+from get_tss_vectorized import *
+from power_fit_coeffs import *
+from get_probabilities import *
+from write_MER_data import *
+from mer_logging import *
+
+def get_eruption_list(source):
+    """
+    eruptions = get_eruption_list(source)
+
+    Description: This function lists the input files, and start files,
+     of the eruptions to be processed.
+
+    Input:
+     'source' - A directory of input files, or a manifest file
+
+    Output:
+     'eruptions' - A list of (data_filename, start_filename) pairs;
+        start_filename is 'None' if there is no start file
+    """
+    eruptions = []
+
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(filename)
+            if ext not in delimeters:
+                continue
+            start_filename = os.path.join(source, stem + '_start.txt')
+            if not os.path.isfile(start_filename):
+                start_filename = 'None'
+            eruptions.append((os.path.join(source, filename), start_filename))
+
+    else:
+        manifest_dir = os.path.dirname(os.path.abspath(source))
+        f = open(source, 'r')
+        for line in f:
+            fields = line.split()
+            if len(fields) == 0 or fields[0].startswith('#'):
+                continue
+            data_filename = os.path.join(manifest_dir, fields[0])
+            if len(fields) > 1:
+                start_filename = os.path.join(manifest_dir, fields[1])
+            else:
+                start_filename = 'None'
+            eruptions.append((data_filename, start_filename))
+        f.close()
+
+    return eruptions
+
+
+def run_eruption(data_filename, start_filename, results_dir, cache_dir=None):
+    """
+    results = run_eruption(data_filename, start_filename, results_dir, cache_dir=None)
+
+    Description: This function runs the MER calculation of main_cloudtype
+     for one eruption, and writes the MER data, power-law fit figure and
+     probabilities to a results directory.
+
+    Input:
+     'data_filename' - The input file of the eruption (.ssv, .csv or .tsv)
+     'start_filename' - A file with the start time of the eruption, or 'None'
+     'results_dir' - The directory the results are written to; it is
+        made if it does not exist
+     'cache_dir' - If given, the input file is read through the binary
+        cache of get_info_cached kept in this directory
+
+    Output:
+     'results' - A dictionary of the time since eruption start ('tss'),
+        MER of particles ('MERpa'), cumulative mass ('mass'), 'cloudtype',
+        and power-law fit coefficients ('c', 'a', 'one_stdev_err')
+    """
+    if not os.path.isdir(results_dir):
+        os.makedirs(results_dir)
+
+    # Get info from txt, with the delimeter set by the file extension
+    if cache_dir is None:
+        [ treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_from_txt(data_filename, delimeter=None)
+    else:
+        [ treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_cached(data_filename, delimeter=None, cache_dir=cache_dir)
+
+    # Get tss
+    tss = get_tss_vectorized(treal_string, start_filename)
+
+    # Get rhos
+    [ rhobar, rhogas] = get_rhos(P0, Pp, maxT, Tb, Rd = 287.)
+
+    # Get N
+    N = get_N(Tb, maxT, Ph, maxPh, g = -9.81)
+
+    # Get MERs and cloudtype
+    [ L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass ] = get_MERs_cloudtype( D1, D2, rhobar, tss, A, N, u, rhogas)
+
+    # Write out MER data
+    write_MER_data(tss, A, maxPh, Ph, rhobar, rhogas, MERpa, mass, cloudtype, results_dir + '/MER_data.csv')
+
+    # Get, plot and save power function coefficients
+    [ x_tss, y_A, power_func, c, a, one_stdev_err ] = power_fit_coeffs(A,tss,cloudtype, filename=results_dir + '/power_fit.png')
+
+    # Get best-fit power function probabilities
+    get_probabilities(c, a, one_stdev_err, results_dir + '/probabilities.txt')
+
+    return {'tss': tss, 'MERpa': MERpa, 'mass': mass, 'cloudtype': cloudtype,
+            'c': c, 'a': a, 'one_stdev_err': one_stdev_err}
+
+
+def run_eruption_safe(eruption):
+    """
+    outcome = run_eruption_safe(eruption)
+
+    Description: This function runs run_eruption for one eruption of
+     batch_cloudtype, and catches any error raised, e.g. by an input file
+     that cannot be read, so that the rest of the batch can go on.
+
+    Input:
+     'eruption' - A (data_filename, start_filename, results_dir, cache_dir)
+        tuple
+
+    Output:
+     'outcome' - A dictionary of the eruption 'name', its 'data_filename',
+        the 'results' of run_eruption (None if it failed), and the 'error'
+        raised and its 'traceback' (None if it did not fail)
+    """
+    data_filename, start_filename, results_dir, cache_dir = eruption
+    outcome = {'name': os.path.basename(results_dir), 'data_filename': data_filename,
+               'results': None, 'error': None, 'traceback': None}
+
+    print "=================== " + outcome['name'] + " ==================="
+    print "Input file = ", data_filename
+    if (start_filename != 'None'):
+        print "Start time file = ", start_filename
+    print " "
+
+    try:
+        outcome['results'] = run_eruption(data_filename, start_filename, results_dir, cache_dir=cache_dir)
+    except Exception as e:
+        outcome['error'] = type(e).__name__ + ': ' + str(e)
+        outcome['traceback'] = traceback.format_exc()
+    finally:
+        plt.close('all')
+
+    return outcome
+
+
+def batch_cloudtype(eruptions, results_root, workers=1, cache_dir=None):
+    """
+    outcomes = batch_cloudtype(eruptions, results_root, workers=1, cache_dir=None)
+
+    Description: This function runs run_eruption for each eruption, either
+     one after the other in this process, or spread over a pool of worker
+     processes.
+
+    Input:
+     'eruptions' - A list of (data_filename, start_filename) pairs, as
+        given by get_eruption_list
+     'results_root' - The directory in which each eruption gets a results
+        directory, named after its input file
+     'workers' - Number of worker processes. 1 runs the eruptions in this
+        process; 0 or None uses one process per core
+     'cache_dir' - If given, input files are read through the binary
+        cache of get_info_cached kept in this directory
+
+    Output:
+     'outcomes' - A list of the dictionaries of run_eruption_safe, in the
+        order of 'eruptions'
+    """
+    jobs = []
+    for data_filename, start_filename in eruptions:
+        name = os.path.splitext(os.path.basename(data_filename))[0]
+        jobs.append((data_filename, start_filename, os.path.join(results_root, name), cache_dir))
+
+    if workers is None or workers == 0:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(jobs))
+
+    if workers <= 1:
+        outcomes = [run_eruption_safe(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            outcomes = pool.map(run_eruption_safe, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return outcomes
+
+
+if __name__ == '__main__':
+
+    # Define the current path
+    path = os.getcwd()
+
+    parser = argparse.ArgumentParser(description='Calculate MER for many eruptions.')
+    parser.add_argument('source', help='directory of input files, or manifest file')
+    parser.add_argument('-o', '--results', default=path[:-4] + '/results',
+                        help='directory in which each eruption gets a results directory')
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help='number of worker processes; 0 for one per core (default: 0)')
+    parser.add_argument('--cache', default=None,
+                        help='directory of binary caches of the parsed input files')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not write the messages of each eruption')
+    args = parser.parse_args()
+    if args.quiet:
+        set_verbosity('quiet')
+
+    eruptions = get_eruption_list(args.source)
+    print "Eruptions = ", len(eruptions)
+    outcomes = batch_cloudtype(eruptions, args.results, workers=args.workers, cache_dir=args.cache)
+
+    # Report the eruptions that failed
+    failed = [outcome for outcome in outcomes if outcome['error'] is not None]
+    print " "
+    print "Completed = ", len(outcomes) - len(failed), " of ", len(outcomes)
+    for outcome in failed:
+        print "Failed: ", outcome['data_filename'], " - ", outcome['error']
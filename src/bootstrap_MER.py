@@ -0,0 +1,212 @@
+"""
+Name: bootstrap_MER
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import multiprocessing		# process pool for the chunks
+import numpy as np			# numpy for array operations
+
+from get_N import get_N
+from get_MERs_vectorized import get_MERs_vectorized
+from get_probabilities import get_rng
+
+# Columns of the input file, as read by read_info_table
+columns = ['time', 'A', 'D1', 'D2', 'Ph', 'Tb', 'P0', 'maxPh', 'maxT', 'Pp', 'Z', 'uk']
+
+# Error model of each perturbed column, in the units of the input file:
+#  ('rel', s) multiplies the value by exp(s*z), a relative error of about
+#  s that keeps the value positive; ('abs', s) adds s*z. z is standard
+#  normal, drawn separately for each image and realization
+default_errors = {'A': ('rel', 0.1), 'D1': ('rel', 0.1), 'D2': ('rel', 0.1),
+                  'Tb': ('abs', 2.), 'maxT': ('abs', 2.), 'uk': ('rel', 0.2)}
+
+
+def perturb_inputs(data_matrix, errors, size, rng):
+    """
+    inputs = perturb_inputs(data_matrix, errors, size, rng)
+
+    Description: This function makes 'size' realizations of the input
+     records, each with its own random errors.
+
+    Input:
+     'data_matrix' - The records of an input file (images x 12), in the
+        units of the file, as read by read_info_table
+     'errors' - Dictionary of the error model of each column to perturb,
+        as in default_errors
+     'size' - Number of realizations
+     'rng' - Random number generator, as made by get_rng
+
+    Output:
+     'inputs' - Dictionary of each column (realizations x images), in the
+        units of the file
+    """
+    inputs = {}
+    for col, name in enumerate(columns):
+        values = np.asarray(data_matrix[:,col], dtype=float)
+        if name not in errors:
+            inputs[name] = np.tile(values, (size, 1))
+            continue
+        kind, scale = errors[name]
+        z = rng.standard_normal((size, len(values)))
+        if kind == 'rel':
+            inputs[name] = values * np.exp(scale * z)
+        elif kind == 'abs':
+            inputs[name] = values + scale * z
+        else:
+            raise ValueError("Error model of " + name + " must be 'rel' or 'abs'")
+    return inputs
+
+
+def ensemble_MERs(data_matrix, tss, errors=None, size=1000, seed=None, Rd=287., g=-9.81):
+    """
+    [ MERpa, mass, total_mass, duration, mean_MERp ] = ensemble_MERs(data_matrix, tss, errors=None, size=1000,
+        seed=None, Rd=287., g=-9.81)
+
+    Description: This function computes MER and cumulative mass for
+     'size' realizations of the input records at once, as 2-D arrays, with
+     the unit conversions of get_info_from_txt, the densities of get_rhos,
+     get_N and get_MERs_vectorized.
+
+    Input:
+     'data_matrix' - The records of an input file (images x 12), in the
+        units of the file, as read by read_info_table
+     'tss' - Vector of number of seconds since the eruption start
+     'errors' - Dictionary of the error model of each column to perturb;
+        None for default_errors
+     'size' - Number of realizations
+     'seed' - Seed of the random number generator; None for a fresh seed
+     'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+
+    Output:
+     'MERpa' - MER of particles (realizations x images) (kg/s)
+     'mass' - Cumulative mass of particles (realizations x images) (kg)
+     'total_mass' - Total mass of each realization (kg)
+     'duration' - Eruption duration of each realization, the time of
+        the greatest cumulative mass (s)
+     'mean_MERp' - Mean MER of particles after the first image, of
+        each realization (kg/s)
+    """
+    if errors is None:
+        errors = default_errors
+    inputs = perturb_inputs(data_matrix, errors, size, get_rng(seed))
+
+    # Unit conversions of get_info_from_txt
+    Ph = inputs['Ph'] * 0.3048
+    Tb = inputs['Tb'] + 273.15
+    P0 = inputs['P0'] * 100.
+    maxPh = inputs['maxPh'] * 0.3048
+    maxT = inputs['maxT'] + 273.15
+    Pp = inputs['Pp'] * 100.
+    u = inputs['uk'] * 514444./1000000.
+
+    # Densities, as in get_rhos, and buoyancy frequency
+    rhobar = P0 / (Tb * Rd)
+    rhogas = Pp / (maxT * Rd)
+    N = get_N(Tb.ravel(), maxT.ravel(), Ph.ravel(), maxPh.ravel(), g = g).reshape(Tb.shape)
+
+    L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass = get_MERs_vectorized(
+        inputs['D1'], inputs['D2'], rhobar, tss, inputs['A'], N, u, rhogas)
+
+    # Summary of each realization, as in get_MERs_cloudtype
+    total_mass = np.max(mass, axis=1)
+    duration = np.asarray(tss, dtype=float)[np.argmax(mass, axis=1)]
+    with np.errstate(invalid='ignore'):
+        mean_MERp = np.nanmean(MERpa[:,1:], axis=1)
+
+    return MERpa, mass, total_mass, duration, mean_MERp
+
+
+def ensemble_chunk(job):
+    # One chunk of realizations of bootstrap_MER, in a worker process
+    data_matrix, tss, errors, size, seed, Rd, g = job
+    return ensemble_MERs(data_matrix, tss, errors=errors, size=size, seed=seed, Rd=Rd, g=g)
+
+
+def bootstrap_MER(data_matrix, tss, errors=None, size=1000, seed=None, percentiles=(5., 50., 95.),
+                  workers=1, chunk_size=250, Rd=287., g=-9.81):
+    """
+    bands = bootstrap_MER(data_matrix, tss, errors=None, size=1000, seed=None, percentiles=(5., 50., 95.),
+        workers=1, chunk_size=250, Rd=287., g=-9.81)
+
+    Description: This function propagates the errors of the observations
+     (area, diameters, brightness temperatures, wind, ...) to MER, mass and
+     eruption duration, by computing them for many realizations of the
+     input records, each with random errors, and gives percentile bands.
+     The realizations are computed a chunk at a time, each chunk with a
+     seed of its own drawn from 'seed', so the result is the same whatever
+     the number of workers. The chunks can be spread over a pool of worker
+     processes.
+
+    Input:
+     'data_matrix' - The records of an input file (images x 12), in the
+        units of the file, as read by read_info_table
+     'tss' - Vector of number of seconds since the eruption start
+     'errors' - Dictionary of the error model of each column to perturb,
+        as in default_errors; None for default_errors
+     'size' - Number of realizations
+     'seed' - Seed of the random number generator; None for a fresh seed
+     'percentiles' - Percentiles of the bands (0 - 100)
+     'workers' - Number of worker processes; 1 computes the chunks in this
+        process, None uses one process per core
+     'chunk_size' - Number of realizations in a chunk, which bounds the
+        memory used
+     'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+
+    Output:
+     'bands' - Dictionary of the percentiles of 'MERpa' and 'mass'
+        (percentiles x images), and of 'total_mass', 'duration' and
+        'mean_MERp' (percentiles), with the 'percentiles' themselves
+    """
+    # One seed for each chunk
+    sizes = [min(chunk_size, size - start) for start in range(0, size, chunk_size)]
+    seeds = np.random.RandomState(seed).randint(0, 2**31 - 1, size=len(sizes))
+    jobs = [(data_matrix, tss, errors, sizes[k], int(seeds[k]), Rd, g) for k in range(len(sizes))]
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(jobs))
+
+    if workers <= 1:
+        chunks = [ensemble_chunk(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            chunks = pool.map(ensemble_chunk, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    names = ['MERpa', 'mass', 'total_mass', 'duration', 'mean_MERp']
+    bands = {'percentiles': np.asarray(percentiles, dtype=float)}
+    for k, name in enumerate(names):
+        values = np.concatenate([chunk[k] for chunk in chunks], axis=0)
+        bands[name] = np.nanpercentile(values, percentiles, axis=0)
+
+    return bands
+
+
+if __name__ == '__main__':
+    # Bands for the Tinakula test data, and the time they take
+    import os
+    import time
+    from get_info_from_txt import read_info_table
+    from get_tss_vectorized import get_tss_vectorized
+
+    path = os.getcwd()
+    treal_string, data_matrix = read_info_table(path[:-4] + '/test/' + 'test_tinakula_1_ftc.ssv')
+    tss = get_tss_vectorized(treal_string, 'None')
+
+    for workers in [1, None]:
+        start = time.time()
+        bands = bootstrap_MER(data_matrix, tss, size=10000, seed=0, workers=workers)
+        print 'workers = ', workers, ': ', time.time() - start, ' s'
+
+    print "Tot. mass ash (5, 50, 95%) = ", bands['total_mass'], " kg"
+    print "mean MERp (5, 50, 95%) = ", bands['mean_MERp'], " kg/s"
+    print "eruption duration (5, 50, 95%) = ", bands['duration'], " s"
@@ -0,0 +1,386 @@
+"""
+Name: fused_MER
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import math					# math operations
+import numpy as np			# numpy for array operations
+
+from get_tss_vectorized import read_start_epoch
+from mer_result import MERResult
+
+# Columns of the records, as read by read_info_table
+columns = ['time', 'A', 'D1', 'D2', 'Ph', 'Tb', 'P0', 'maxPh', 'maxT', 'Pp', 'Z', 'uk']
+
+
+class FusedMER(object):
+    """
+    engine = FusedMER(start_filename='None', Rd=287., g=-9.81, L_dwp=0.845, L_umb=1.,
+        ratio_threshold=3., N_fallback=0.035)
+    result = engine.run(data_matrix)
+
+    Description: Computes MER, cumulative mass and cloudtype straight from
+     the records of an input file, in the units of the file, doing the
+     work of get_info_from_txt, get_tss_vectorized, get_rhos, get_N and
+     get_MERs_vectorized in one pass. Every step writes into arrays that
+     are kept by the engine and reused by the next run, so that
+     reprocessing long archives makes no new arrays after the first
+     run, and needs under half the memory of the chain of functions.
+     Results are the same as those of the chain, to within floating
+     point rounding.
+
+     Times are taken to be real dates, and are not checked as they are
+     by get_tss_vectorized. The time of a start file is checked.
+
+    Input:
+     'start_filename' - A .txt file with the start time of the eruption
+        (YYYYMMDDHHMMSS). If start_filename == 'None', the start time is
+        the time of the first record of each run
+     'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+     'L_dwp', 'L_umb', 'ratio_threshold' - As for get_MERs_cloudtype
+     'N_fallback' - As for get_N
+
+    Methods:
+     'run' - Gets an MERResult, with 'tss', for the records of a
+        data matrix (images x 12), as read by read_info_table. Its arrays
+        are those of the engine, and are overwritten by the next run;
+        copy them to keep them
+     'reserve' - Makes room for at least n records
+
+    Attributes:
+     'capacity' - The number of records there is room for
+     'nbytes' - Memory held by the engine (bytes)
+    """
+
+    def __init__(self, start_filename='None', Rd=287., g=-9.81, L_dwp=0.845, L_umb=1.,
+                 ratio_threshold=3., N_fallback=0.035):
+        self.start = None
+        if start_filename != 'None':
+            self.start = read_start_epoch(start_filename)
+        self.Rd = Rd
+        self.g = g
+        self.L_dwp = L_dwp
+        self.L_umb = L_umb
+        self.ratio_threshold = ratio_threshold
+        self.N_fallback = N_fallback
+        self.capacity = -1
+        self.reserve(0)
+
+    def reserve(self, n):
+        if n <= self.capacity:
+            return
+        # Outputs, working space and masks
+        self.outputs = dict((name, np.empty(n)) for name in MERResult.fields + ('tss',))
+        self.work = dict((name, np.empty(n)) for name in ['rhobar', 'rhogas', 'N', 'u', 's1', 's2', 's3'])
+        self.run_id = np.empty(n, dtype=np.int64)
+        self.masks = dict((name, np.empty(n, dtype=bool)) for name in ['dwp', 'm1', 'm2'])
+        self.capacity = n
+
+    @property
+    def nbytes(self):
+        arrays = list(self.outputs.values()) + list(self.work.values()) + list(self.masks.values())
+        return sum(a.nbytes for a in arrays) + self.run_id.nbytes
+
+    def get_tss(self, time, tss, Y, O, S, days, era, march):
+        # Seconds since the eruption start of times YYYYMMDDHHMMSS, by
+        #  integer arithmetic in place: the days of the first of each
+        #  month are counted from 1970 by the civil calendar algorithm
+        #  of H. Hinnant, as a proleptic Gregorian calendar
+        np.rint(time, out=tss)
+        np.copyto(Y, tss, casting='unsafe')
+        np.remainder(Y, 100, out=S)                         # second
+        np.floor_divide(Y, 100, out=Y)
+        np.remainder(Y, 100, out=O)
+        O *= 60
+        S += O                                              # + minute
+        np.floor_divide(Y, 100, out=Y)
+        np.remainder(Y, 100, out=O)
+        O *= 3600
+        S += O                                              # + hour
+        np.floor_divide(Y, 100, out=Y)
+        np.remainder(Y, 100, out=O)
+        O -= 1
+        O *= 86400
+        S += O                                              # + day - 1
+        np.floor_divide(Y, 100, out=Y)
+        np.remainder(Y, 100, out=O)                         # month
+        np.floor_divide(Y, 100, out=Y)                      # year
+
+        # Years start in March, so that leap days end them
+        np.less_equal(O, 2, out=march)
+        np.subtract(Y, march, out=Y)
+        O += 9
+        np.remainder(O, 12, out=O)
+        O *= 153
+        O += 2
+        np.floor_divide(O, 5, out=O)                        # day of year
+        np.floor_divide(Y, 400, out=era)
+        np.multiply(era, 146097, out=days)
+        era *= 400
+        Y -= era                                            # year of era
+        days += O
+        np.multiply(Y, 365, out=O)
+        days += O
+        np.floor_divide(Y, 4, out=O)
+        days += O
+        np.floor_divide(Y, 100, out=O)
+        days -= O
+        days -= 719468
+        days *= 86400
+        S += days                                           # epoch seconds
+
+        start = S[0] if self.start is None else self.start
+        np.subtract(S, start, out=tss)
+
+    def run(self, data_matrix):
+        """
+        result = engine.run(data_matrix)
+        """
+        n = len(data_matrix)
+        self.reserve(n)
+        out = dict((name, values[:n]) for name, values in self.outputs.items())
+        work = dict((name, values[:n]) for name, values in self.work.items())
+        masks = dict((name, values[:n]) for name, values in self.masks.items())
+        col = dict((name, data_matrix[:,k]) for k, name in enumerate(columns))
+        L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss = [out[name] for name in MERResult.fields + ('tss',)]
+        rhobar, rhogas, N, u, s1, s2, s3 = [work[name] for name in ['rhobar', 'rhogas', 'N', 'u', 's1', 's2', 's3']]
+        dwp, m1, m2 = masks['dwp'], masks['m1'], masks['m2']
+        if n == 0:
+            return MERResult(L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=tss)
+
+        # Seconds since the eruption start, with the working space used
+        #  as integers
+        run_id = self.run_id[:n]
+        self.get_tss(col['time'], tss, s1.view(np.int64), s2.view(np.int64), s3.view(np.int64),
+                     mass.view(np.int64), run_id, m1)
+
+        # Densities, as get_rhos, with the units of get_info_from_txt
+        np.multiply(col['P0'], 100., out=rhobar)
+        np.add(col['Tb'], 273.15, out=s1)
+        s1 *= self.Rd
+        rhobar /= s1
+        np.multiply(col['Pp'], 100., out=rhogas)
+        np.add(col['maxT'], 273.15, out=s1)
+        s1 *= self.Rd
+        rhogas /= s1
+
+        # Buoyancy frequency, as get_N, with the fallback where N^2 is not
+        #  real and positive
+        np.add(col['maxT'], 273.15, out=s1)
+        np.add(col['Tb'], 273.15, out=s2)
+        s1 -= s2
+        np.multiply(col['maxPh'], 0.3048, out=s3)
+        np.multiply(col['Ph'], 0.3048, out=N)
+        s3 -= N
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s1 /= s3
+            np.divide(self.g, s2, out=s2)
+            np.negative(s2, out=s2)
+            np.multiply(s2, s1, out=N)
+            np.isfinite(N, out=m1)
+            np.greater(N, 0, out=m2)
+        m1 &= m2
+        np.sqrt(N, out=N, where=m1)
+        np.logical_not(m1, out=m2)
+        np.copyto(N, self.N_fallback, where=m2)
+
+        np.multiply(col['uk'], 514444./1000000., out=u)
+
+        # Cloud type and lambda from the ratio of the diameters;
+        #  cloudtype 1 = downwind plume, cloudtype 2 = umbrella cloud
+        np.maximum(col['D1'], col['D2'], out=s1)
+        np.minimum(col['D1'], col['D2'], out=s2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s1 /= s2
+        np.greater(s1, self.ratio_threshold, out=dwp)
+        cloudtype.fill(2.)
+        np.copyto(cloudtype, 1., where=dwp)
+        L.fill(self.L_umb)
+        np.copyto(L, self.L_dwp, where=dwp)
+
+        # Differences over each image pair, kept at the current (second)
+        #  image of the pair: of A^2 and A^(3/2) (m), and of t, t^2 and t^3
+        np.multiply(col['A'], 1000000., out=s1)
+        np.multiply(s1, s1, out=s3)
+        np.power(s1, 1.5, out=s2)
+        np.subtract(s3[1:], s3[:-1], out=MERpl[1:])
+        np.subtract(s2[1:], s2[:-1], out=MERpli[1:])
+        np.multiply(tss, tss, out=s1)
+        np.subtract(s1[1:], s1[:-1], out=s2[1:])
+        s1 *= tss
+        np.subtract(s1[1:], s1[:-1], out=s3[1:])
+        np.subtract(tss[1:], tss[:-1], out=s1[1:])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # MER of DWP, continuous release: 9 rhobar dA^2 / (8 L N u dt^3)
+            MERpl[1:] /= s3[1:]
+            np.multiply(L, N, out=s3)
+            np.divide(rhobar, s3, out=s3)
+            MERpl[1:] *= s3[1:]
+            MERpl[1:] /= u[1:]
+            MERpl[1:] *= 9. / 8.
+
+            # MER of umbrella cloud, continuous and instantaneous release:
+            #  2 rhobar dA^(3/2) / (3 sqrt(pi) L N dt^2), and over dt
+            s3 *= 2. / (3. * math.sqrt(math.pi))
+            np.divide(MERpli[1:], s2[1:], out=s2[1:])
+            s2[1:] *= s3[1:]
+            MERpli[1:] /= s1[1:]
+            MERpli[1:] *= s3[1:]
+
+        # A shrinking cloud means the eruption stopped
+        np.logical_not(dwp, out=m2)
+        np.copyto(MERpl[1:], s2[1:], where=m2[1:])
+        np.maximum(MERpl, 0., out=MERpl)
+        np.maximum(MERpli, 0., out=MERpli)
+        np.copyto(MERpli, 0., where=dwp)
+        MERpl[0] = 0.
+        MERpli[0] = 0.
+
+        # MER of particles, only where the cloud is denser than the gas
+        np.greater(rhobar, rhogas, out=m1)
+        np.logical_not(m1, out=m2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(rhogas, rhobar, out=s3)
+        np.subtract(1., s3, out=s3)
+        np.multiply(MERpl, s3, out=MERpa)
+        np.copyto(MERpa, 0., where=m2)
+        np.multiply(MERpli, s3, out=MERpai)
+        np.copyto(MERpai, 0., where=m2)
+        np.copyto(MERpai, 0., where=dwp)
+        np.maximum(MERpai, 0., out=MERpai)
+
+        # Mass added over each image pair, summed within each run of
+        #  growing pairs by the log-step scan of get_MERs_vectorized, back
+        #  and forth between two arrays
+        s1[1:] *= MERpa[1:]
+        s1[0] = 0.
+        np.greater(s1, 0., out=m1)
+        np.logical_not(m1, out=m2)
+        np.copyto(s1, 0., where=m2)
+        np.copyto(run_id, m2)
+        np.cumsum(run_id, out=run_id)
+        cum, nxt = s1, s2
+        step = 1
+        while step < n - 1:
+            np.copyto(nxt, cum)
+            np.equal(run_id[step:], run_id[:-step], out=m2[step:])
+            np.add(nxt[step:], cum[:-step], out=nxt[step:], where=m2[step:])
+            cum, nxt = nxt, cum
+            step *= 2
+        np.copyto(mass, cum)
+
+        return MERResult(L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=tss)
+
+
+if __name__ == '__main__':
+    # Time and memory of the engine against the chain of functions, for
+    #  the Tinakula test data repeated to archive length:
+    #
+    #  > python fused_MER.py [repeats]
+    #
+    #  Each is measured in a new process of its own, with getrusage: the
+    #  growth of the peak resident memory, and the minor page faults,
+    #  which come as memory allocated afresh is first touched, and so
+    #  count the allocations that are not reused. 'fused again' is the
+    #  second run of an engine, whose arrays are already there. The
+    #  processes are started before this one makes any large array, as
+    #  the peak memory of a process starts from that of its parent
+    import os
+    import sys
+    import gc
+    import time
+    import resource
+    import subprocess
+    from get_info_from_txt import read_info_table
+    from get_tss_vectorized import get_tss_vectorized
+    from get_rhos import get_rhos
+    from get_N import get_N
+    from get_MERs_vectorized import get_MERs_vectorized
+    from mer_logging import set_verbosity
+
+    def chain(data_matrix):
+        times = data_matrix[:,0].astype(np.int64).astype(str)
+        tss = get_tss_vectorized(times, 'None')
+        Ph = data_matrix[:,4] * 0.3048
+        Tb = data_matrix[:,5] + 273.15
+        P0 = data_matrix[:,6] * 100.
+        maxPh = data_matrix[:,7] * 0.3048
+        maxT = data_matrix[:,8] + 273.15
+        Pp = data_matrix[:,9] * 100.
+        u = data_matrix[:,11] * 514444./1000000.
+        rhobar, rhogas = get_rhos(P0, Pp, maxT, Tb, Rd = 287.)
+        N = get_N(Tb, maxT, Ph, maxPh, g = -9.81)
+        return get_MERs_vectorized(data_matrix[:,2], data_matrix[:,3], rhobar, tss, data_matrix[:,1], N, u, rhogas)
+
+    def make_records(data, nrep):
+        # The records repeated with time running on, a month per repeat
+        #  from January 2017. They are made a hundred repeats at a time,
+        #  so that no large array is made and freed before measuring
+        data_matrix = np.empty((nrep * len(data), data.shape[1]))
+        for first in range(0, nrep, 100):
+            repeat = np.arange(first, min(first + 100, nrep))
+            block = np.tile(data, (len(repeat), 1))
+            block[:,0] += np.repeat((repeat % 12 - 9) * 100000000 + repeat // 12 * 10000000000, len(data))
+            data_matrix[first * len(data):(first + len(repeat)) * len(data)] = block
+        return data_matrix
+
+    def usage():
+        # Peak resident memory (bytes) and minor page faults; ru_maxrss
+        #  is in bytes on OS X and in kilobytes elsewhere
+        r = resource.getrusage(resource.RUSAGE_SELF)
+        unit = 1 if sys.platform == 'darwin' else 1024
+        return r.ru_maxrss * unit, r.ru_minflt
+
+    set_verbosity('summary')
+    path = os.getcwd()
+    treal_string, data = read_info_table(path[:-4] + '/test/' + 'test_tinakula_1_ftc.ssv')
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        # In a process of its own: measure one variant
+        variant, nrep = sys.argv[2], int(sys.argv[3])
+        data_matrix = make_records(data, nrep)
+        engine = FusedMER()
+        if variant == 'chain':
+            function = chain
+        else:
+            function = engine.run
+            if variant == 'fused again':
+                engine.run(data_matrix)
+        gc.collect()
+        peak, faults = usage()
+        start = time.time()
+        function(data_matrix)
+        elapsed = time.time() - start
+        new_peak, new_faults = usage()
+        print new_peak - peak, new_faults - faults, elapsed
+        sys.exit(0)
+
+    nrep = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    # Each variant in a new process
+    for variant in ['chain', 'fused', 'fused again']:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--measure',
+                                          variant, str(nrep)])
+        peak, faults, elapsed = [float(v) for v in output.split()[-3:]]
+        print '%-12s %.3f s, peak memory + %.1f MB, page faults %d' % (
+            variant + ':', elapsed, peak / 1e6, faults)
+
+    data_matrix = make_records(data, nrep)
+
+    # The same results, with NaN in the same places
+    chain_result = chain(data_matrix)
+    engine = FusedMER()
+    fused_result = engine.run(data_matrix)
+    for name in MERResult.fields + ('tss',):
+        x = getattr(chain_result, name)
+        y = getattr(fused_result, name)
+        nan = np.isnan(x)
+        print name, 'matches:', np.array_equal(nan, np.isnan(y)) and np.allclose(x[~nan], y[~nan], rtol=1e-12)
+    print 'records:', len(data_matrix)
+    print 'memory held by the engine: %.1f MB' % (engine.nbytes / 1e6)
@@ -1,20 +1,24 @@
 """
 Name: get_MERs_cloudtype
-Version: 0.5
-Date: 6 February 2018
+Version: 0.6
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
 """
 
+import logging				# verbosity levels
 import numpy as np			# numpy for array operations
 import math					# math operations
 
+from mer_logging import logger
+from mer_result import MERResult
+
 
 class MER_Error(Exception):
     pass
 
-def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
+def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp=0.845, L_umb=1., ratio_threshold=3.):
     """ 
     Description: This function gets the mass eruption rates for 
     the identified cloudtype (umbrella cloud or downwind plume). 
@@ -24,7 +28,7 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
 
     Use:
     [ L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass] = \
-    get_MERs_cloudtype( D1, D2, rhobar, tss, A, u, rhogas)
+    get_MERs_cloudtype( D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp=0.845, L_umb=1., ratio_threshold=3.)
 
     Input: 
      'D1' - Vector of diameter measurement of the ash cloud in 
@@ -43,6 +47,12 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
      'u' - Vector of wind speed in m/s in each image (m/s)
      'rhogas' - The density of the gas in the ash cloud, 
         Eqn. (13) in April 2013 paper
+     'L_dwp' - Lambda, the shape factor, of a downwind plume
+        (Bursik et al estimate 0.83)
+     'L_umb' - Lambda of an umbrella cloud (possibly should be 0.2,
+        Suzuki and Koyaguchi)
+     'ratio_threshold' - The cloud is a downwind plume if the ratio of
+        its larger to its smaller diameter is greater than this
 
     Output:
      'L' - A vector of lambda values, describe shape factor 
@@ -57,6 +67,12 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
      'mass' - A vector of cumulative mass of particles up to the indicated time (kg)
      'cloudtype' - A vector that gives a label for cloudtype; 
         cloudtype 1 = downwindplume, cloudtype 2 = umbrella cloud
+     The outputs come as an MERResult, which unpacks as the 7 outputs
+     above, and also gives the summary of the eruption (result.total_mass,
+     result.mean_MERp, result.duration, ...).
+
+     The growth of the cloud in each image, and the summary, are written
+     to the screen through mer_logging; see set_verbosity.
     """
 
     # Pre-allocate space for each vector
@@ -69,8 +85,8 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
     mass = np.zeros(len(D1))
 
     # Go through each image
-    print "  "
-    print "xxxxxxxxxxxxxxxxxx Cloud growth xxxxxxxxxxxxxxxxxxxxxxxxx"
+    logger.debug("  ")
+    logger.debug("xxxxxxxxxxxxxxxxxx Cloud growth xxxxxxxxxxxxxxxxxxxxxxxxx")
     for cur_img in range(0,len(D1)):
 
         # Use extracted diameters of the cloud to identify if the plume
@@ -78,9 +94,9 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
         ratio = np.amax([D1[cur_img],D2[cur_img]])/np.min([D1[cur_img],D2[cur_img]])
         # DEBUG: print "A, D1, D2, ratio =  ", A[cur_img], D1[cur_img], D2[cur_img], ratio
 
-        if (ratio > 3.):
+        if (ratio > ratio_threshold):
             # Identify lambda value
-            L[cur_img] = 0.845 # Bursik et al estimate 0.83
+            L[cur_img] = L_dwp # Bursik et al estimate 0.83
             # Identify cloud type
             cloudtype[cur_img] = 1
 
@@ -96,10 +112,10 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
                      (( (A[cur_img]*1000000.)**2 - (A[cur_img-1]*1000000.)**2) / (tss[cur_img]**3 - tss[cur_img-1]**3))
 
                 if MERpl[cur_img] >= 0:
-                    print "Cloud is spreading as a downwind plume."
+                    logger.debug("Cloud is spreading as a downwind plume.")
  
                 if MERpl[cur_img] < 0:
-                    print "Dissipating. Eruption stopped."
+                    logger.debug("Dissipating. Eruption stopped.")
                     MERpl[cur_img] = 0.0
 
                 # MER of particles into DWP, continuous release
@@ -113,11 +129,11 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
 #                    print "sgn(dA/dt) = -1 => Dissipating."                    
 #                    MERpa[cur_img] = 0.0
 #                else: 
-                print "Mass flux of ash into cloud = ", MERpa[cur_img], " kg/s"
+                logger.debug("Mass flux of ash into cloud =  %s  kg/s", MERpa[cur_img])
 
         else:
             # Identify lambda value
-            L[cur_img] = 1 # possibly should be 0.2 (Suzuki and Koyaguchi)
+            L[cur_img] = L_umb # possibly should be 0.2 (Suzuki and Koyaguchi)
             # Identify cloud type
             cloudtype[cur_img] = 2
 
@@ -136,10 +152,10 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
                   (((A[cur_img]*1000000.)**(3./2.) - (A[cur_img-1]*1000000.)**(3./2.)) / (tss[cur_img]**2 - tss[cur_img-1]**2))
 
                 if MERpl[cur_img] >= 0:
-                    print "Cloud is spreading as an umbrella cloud."
+                    logger.debug("Cloud is spreading as an umbrella cloud.")
 
                 if MERpl[cur_img] < 0:
-                    print "Cloud dissipating. Eruption stopped."
+                    logger.debug("Cloud dissipating. Eruption stopped.")
                     MERpl[cur_img] = 0.0
 
                 # Mass of umbrella cloud assuming instantaneous
@@ -147,7 +163,7 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
                   (((A[cur_img]*1000000.)**(3./2.) - (A[cur_img-1]*1000000.)**(3./2.)) / (tss[cur_img] - tss[cur_img-1]))
 
                 if MERpli[cur_img] < 0:
-                    print "Cloud dissipating. Eruption stopped."
+                    logger.debug("Cloud dissipating. Eruption stopped.")
                     MERpli[cur_img] = 0.0
                           
                 # MER of particles into umbrella cloud, continuous release
@@ -159,7 +175,7 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
 #                if MERpa[cur_img] < 0:
 #                    MERpa[cur_img] = 0.0
 #                else:
-                print "Mass flux ash into cloud = ", MERpa[cur_img], " kg/s"
+                logger.debug("Mass flux ash into cloud =  %s  kg/s", MERpa[cur_img])
                         
                 # Mass of particles in umbrella cloud, instantaneous release
                 if rhobar[cur_img] > rhogas[cur_img]:
@@ -188,24 +204,23 @@ def get_MERs_cloudtype(D1, D2, rhobar, tss, A, N, u, rhogas):
 	#  when it changes
     #cloudtype = np.array([1, 1, 2, 2, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2])
 
-    print "xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx"
-    print " "
-    print "****************** Summary information *******************"
-    
-    mean_MERp = np.nanmean(MERpa[1:len(MERpa)])
-    if len(MERpa) >= 3:
-        std_MERp = np.nanstd(MERpa)
-    else:
-        std_MERp = 0.0
-    print "Tot. mass ash = ", np.max(mass), " kg"
-    print "Est. volume (DRE) = ", np.max(mass) / 2500. / 1000000000., " cu km"
-    print "MERp(t) = ", list(MERpa), " kg/s"
-    print "mean MERp = ", int(mean_MERp), " +/- ", int(std_MERp), " kg/s "
-    if tss[len(D1)-1] == tss[np.argmax(mass)]:
-        print "eruption duration .ge. ", int(np.amin([tss[len(D1)-1],tss[np.argmax(mass)]])), " s" 
-    else:
-        print "eruption duration = ", int(np.amin([tss[len(D1)-1],tss[np.argmax(mass)]])), " s"         
-    print "**********************************************************"
-
-    return L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass
+    logger.debug("xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
+
+    result = MERResult(L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=tss)
+
+    # The summary is only worked out, and formatted, if it is to be seen
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(" ")
+        logger.info("****************** Summary information *******************")
+        logger.info("Tot. mass ash =  %s  kg", result.total_mass)
+        logger.info("Est. volume (DRE) =  %s  cu km", result.volume_DRE)
+        logger.info("MERp(t) =  %s  kg/s", list(MERpa))
+        logger.info("mean MERp =  %s  +/-  %s  kg/s ", int(result.mean_MERp), int(result.std_MERp))
+        if tss[len(D1)-1] == tss[np.argmax(mass)]:
+            logger.info("eruption duration .ge.  %s  s", int(np.amin([tss[len(D1)-1],tss[np.argmax(mass)]])))
+        else:
+            logger.info("eruption duration =  %s  s", int(np.amin([tss[len(D1)-1],tss[np.argmax(mass)]])))
+        logger.info("**********************************************************")
+
+    return result
 
@@ -0,0 +1,175 @@
+"""
+Name: get_MERs_vectorized
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+import math					# math operations
+
+from mer_result import MERResult
+
+
+def get_MERs_vectorized(D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp=0.845, L_umb=1., ratio_threshold=3.):
+    """
+    Use:
+    [ L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass] = \
+    get_MERs_vectorized( D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp=0.845, L_umb=1., ratio_threshold=3.)
+
+    Description: Array-based version of get_MERs_cloudtype. The
+     cloudtype, lambda, MER and cumulative mass of every image are
+     computed at once with numpy instead of in a loop over images,
+     and nothing is printed. Results are the same as those of
+     get_MERs_cloudtype, to within floating point rounding of the
+     cumulative mass.
+
+     All inputs are broadcast against each other, and images run along
+     the last axis, so 2-D inputs (realizations x images) give 2-D
+     outputs. The same holds for L_dwp, L_umb and ratio_threshold, so
+     that e.g. (scenarios x 1) arrays of them give the results of every
+     scenario at once.
+
+    Input:
+     'D1' - Vector of diameter measurement of the ash cloud in
+        each image (km)
+     'D2' - Vector of diameter measurement of the ash cloud in
+        each image (km)
+     'rhobar' - Plume density at height and temperature of the plume
+        at neutral buoyancy, Eqn. (4) in April 2013 paper
+     'tss' - Vector of number of seconds since the eruption
+     'A' - Vector of area of the ash cloud in each image (km^2)
+     'N' - The buoyancy frequency
+     'u' - Vector of wind speed in m/s in each image (m/s)
+     'rhogas' - The density of the gas in the ash cloud,
+        Eqn. (13) in April 2013 paper
+     'L_dwp', 'L_umb', 'ratio_threshold' - Lambda of a downwind plume and
+        of an umbrella cloud, and the diameter ratio above which the cloud
+        is a downwind plume, as for get_MERs_cloudtype
+
+    Output:
+     As for get_MERs_cloudtype, an MERResult of:
+     'L', 'MERpl', 'MERpli', 'MERpa', 'MERpai', 'cloudtype', 'mass'
+    """
+
+    # Make every input a float array of the same shape
+    D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp, L_umb, ratio_threshold = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (D1, D2, rhobar, tss, A, N, u, rhogas, L_dwp, L_umb, ratio_threshold)])
+    shape = D1.shape
+
+    # Identify cloud type and lambda from the ratio of the diameters;
+    #  cloudtype 1 = downwind plume, cloudtype 2 = umbrella cloud
+    ratio = np.maximum(D1, D2) / np.minimum(D1, D2)
+    dwp = ratio > ratio_threshold
+    L = np.where(dwp, L_dwp, L_umb)
+    cloudtype = np.where(dwp, 1., 2.)
+
+    # Pre-allocate space for each output; the first image has no
+    #  previous image to compare to, so its rates stay at zero
+    MERpl = np.zeros(shape)
+    MERpli = np.zeros(shape)
+    MERpa = np.zeros(shape)
+    MERpai = np.zeros(shape)
+    mass = np.zeros(shape)
+
+    # Current (1) and previous (0) image of every image pair
+    Am = A * 1000000.
+    t1 = tss[..., 1:]
+    t0 = tss[..., :-1]
+    rb = rhobar[..., 1:]
+    rg = rhogas[..., 1:]
+    L1 = L[..., 1:]
+    N1 = N[..., 1:]
+    dwp1 = dwp[..., 1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # MER of DWP, continuous release
+        pl_dwp = ((9. * rb) / (8. * L1 * N1 * u[..., 1:])) * \
+                 ((Am[..., 1:]**2 - Am[..., :-1]**2) / (t1**3 - t0**3))
+
+        # MER of umbrella cloud, continuous and instantaneous release
+        dA32 = Am[..., 1:]**(3./2.) - Am[..., :-1]**(3./2.)
+        pl_umb = (2. * rb / (3. * math.sqrt(math.pi) * L1 * N1)) * (dA32 / (t1**2 - t0**2))
+        pli_umb = (2. * rb) / (3. * math.sqrt(math.pi) * L1 * N1) * (dA32 / (t1 - t0))
+
+        # A shrinking cloud means the eruption stopped
+        pl = np.where(dwp1, pl_dwp, pl_umb)
+        pl = np.where(pl < 0, 0., pl)
+        pli = np.where(dwp1 | (pli_umb < 0), 0., pli_umb)
+
+        # MER of particles, only where the cloud is denser than the gas
+        dense = rb > rg
+        frac = 1 - (rg / rb)
+        pa = np.where(dense, pl * frac, 0.)
+        pai = np.where(dense & ~dwp1, pli * frac, 0.)
+        pai = np.where(pai < 0, 0., pai)
+
+        # Mass added over each image pair
+        dmass = pa * (t1 - t0)
+
+    MERpl[..., 1:] = pl
+    MERpli[..., 1:] = pli
+    MERpa[..., 1:] = pa
+    MERpai[..., 1:] = pai
+
+    # Cumulative mass restarts from zero after every image pair that
+    #  adds no mass. Sum the increments within each run of growing
+    #  pairs with a log-step scan, which keeps the rounding error at the
+    #  size of the run rather than of the whole record
+    growing = dmass > 0.0
+    run_id = np.cumsum(~growing, axis=-1)
+    cum = np.where(growing, dmass, 0.)
+    step = 1
+    while step < cum.shape[-1]:
+        same_run = run_id[..., step:] == run_id[..., :-step]
+        cum[..., step:] = cum[..., step:] + np.where(same_run, cum[..., :-step], 0.)
+        step *= 2
+    mass[..., 1:] = cum
+
+    return MERResult(L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=tss)
+
+
+if __name__ == '__main__':
+    # Benchmark against get_MERs_cloudtype on the Tinakula test data,
+    #  repeated to archive length
+    import os
+    import sys
+    import timeit
+    from get_MERs_cloudtype import get_MERs_cloudtype
+    from mer_logging import set_verbosity
+
+    path = os.getcwd()
+    data = np.loadtxt(path[:-4] + '/test/' + 'test_tinakula_1_ftc.ssv', skiprows=1)
+    nrep = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    # Inputs as built by main_cloudtype, with time running on
+    #  across repeats
+    step = 600. * (len(data) + 1)
+    tss = np.concatenate([np.arange(len(data)) * 600. + i * step for i in range(nrep)])
+    A, D1, D2 = [np.tile(data[:, col], nrep) for col in (1, 2, 3)]
+    rhobar = np.tile(data[:, 6] * 100. / ((data[:, 5] + 273.15) * 287.), nrep)
+    rhogas = np.tile(data[:, 9] * 100. / ((data[:, 8] + 273.15) * 287.), nrep)
+    N = np.full(len(tss), 0.035)
+    u = np.tile(data[:, 11] * 514444./1000000., nrep)
+    args = (D1, D2, rhobar, tss, A, N, u, rhogas)
+
+    # Silence the per-image output of the loop version
+    set_verbosity('quiet')
+    start = timeit.default_timer()
+    loop_results = get_MERs_cloudtype(*args)
+    loop_time = timeit.default_timer() - start
+    set_verbosity('verbose')
+
+    start = timeit.default_timer()
+    vec_results = get_MERs_vectorized(*args)
+    vec_time = timeit.default_timer() - start
+
+    names = ['L', 'MERpl', 'MERpli', 'MERpa', 'MERpai', 'cloudtype', 'mass']
+    for name, loop_res, vec_res in zip(names, loop_results, vec_results):
+        nan = np.isnan(loop_res)
+        print name, 'matches:', np.array_equal(nan, np.isnan(vec_res)) and \
+            np.allclose(loop_res[~nan], vec_res[~nan], rtol=1e-12)
+    print 'images:', len(tss)
+    print 'loop: %.4f s, vectorized: %.4f s, speed-up: %.0fx' % (loop_time, vec_time, loop_time / vec_time)
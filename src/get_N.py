@@ -1,7 +1,7 @@
 """
 Name: get_N
-Version: 0.4
-Date: 07 December 2017
+Version: 0.5
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
@@ -10,11 +10,26 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 import numpy as np				# numpy for array operations
 
-def get_N(Tb, maxT, Ph, maxPh, g = -9.81):
+from isa_table import height_at_temperature, temperature_at_height
+
+def get_N(Tb, maxT, Ph, maxPh, g = -9.81, N_fallback = 0.035, fill_missing = False,
+          N_min = None, N_max = None, return_mask = False, cp = None):
     """
-    N = get_N(PTb, maxT, Ph, maxPh, g = -9.81)
+    N = get_N(Tb, maxT, Ph, maxPh, g = -9.81, N_fallback = 0.035, fill_missing = False,
+        N_min = None, N_max = None, return_mask = False, cp = None)
 
     Description: This function calculates the buoyancy frequency. 
+     Each image is taken on its own: where the temperatures and heights
+     give no real, positive buoyancy frequency (missing values, the same
+     height at the top and the level of neutral buoyancy, or temperature
+     falling with height), the fallback is used for that image only.
+     Missing (NaN) heights can be filled with the height of the temperature
+     in the standard atmosphere, and missing temperatures with the
+     temperature at the height, looked up in the tables of isa_table.
+     With 'cp', the temperatures are taken to be those of the atmosphere
+     around the cloud, as from a sounding, and N is that of the
+     atmosphere, N^2 = (g/T) (dT/dz + g/cp), which is positive wherever
+     temperature falls more slowly with height than the dry adiabat.
 
     Input:
      'Tb' - Vector of brightness temperature max *outer edge* (K)
@@ -23,16 +38,56 @@ def get_N(Tb, maxT, Ph, maxPh, g = -9.81):
         buoyancy in each image (m)
      'maxPh' - Vector of maximum plume height in each image (m)
      'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+     'N_fallback' - The buoyancy frequency used when it cannot be
+        calculated from the temperatures (1/s), one for all images or one
+        per image; NaN to leave those images NaN
+     'fill_missing' - True to fill missing heights and temperatures from
+        the standard atmosphere
+     'N_min', 'N_max' - Bounds to which the calculated buoyancy frequency
+        is clipped (1/s); None for no bound
+     'return_mask' - True to also return which images were calculated
+     'cp' - Specific heat of dry air at constant pressure (J/K/kg), e.g.
+        1004, to add the dry adiabatic lapse rate for temperatures of the
+        atmosphere; None for the formula for temperatures of the cloud
 
     Output:
      'N' - The buoyancy frequency, assuming the min height of plume is Ph, 
         min temp of plume is maxT 
+     'valid' - If return_mask, a boolean vector, True where N was
+        calculated and False where it is the fallback
     """
 
-    # Calculate N
-    if (np.subtract(maxT.any(), Tb.any(), dtype=np.float)) > 0: 
-        N = np.sqrt(-(g/Tb) * ((maxT - Tb) / (maxPh - Ph)))
-    else:
-        N = np.full(shape=len(Tb), fill_value=0.035, dtype=float)
+    Tb = np.asarray(Tb, dtype=float)
+    maxT = np.asarray(maxT, dtype=float)
+    Ph = np.asarray(Ph, dtype=float)
+    maxPh = np.asarray(maxPh, dtype=float)
+    if fill_missing:
+        Ph = fill_from(Ph, height_at_temperature, Tb)
+        maxPh = fill_from(maxPh, height_at_temperature, maxT)
+        Tb = fill_from(Tb, temperature_at_height, Ph)
+        maxT = fill_from(maxT, temperature_at_height, maxPh)
+
+    # Calculate N^2 for every image, and keep those that are real and
+    #  positive
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lapse = (maxT - Tb) / (maxPh - Ph)
+        if cp is not None:
+            lapse = lapse - g / cp
+        N2 = -(g/Tb) * lapse
+        valid = np.isfinite(N2) & (N2 > 0)
+    N = np.sqrt(np.where(valid, N2, 1.))
+    if N_min is not None or N_max is not None:
+        N = np.clip(N, N_min, N_max)
+    N = np.where(valid, N, N_fallback)
 
+    if return_mask:
+        return N, valid
     return N
+
+def fill_from(values, standard, other):
+    # values, with NaN replaced by the standard atmosphere at other
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    return np.where(missing, standard(other), values)
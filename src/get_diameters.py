@@ -9,16 +9,15 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 import sys				# for main path directory
 import numpy as np		# numpy for array operations
-import math				# math operations
 import cv2				# image processing operations
 
-def get_diameters(count,contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_per_pixel):
+def get_diameters(count,contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_per_pixel, draw=True, writer=None):
 	"""
         Description: This function gets the minimum and maximum diameters 
           from a set of radii to the center of mass of a volcanic cloud. It converts 
 	  the diameters from pixels to km.
 
-	[D1, D2] = get_diameters(radii, cur_x0, cur_y0, km_per_pixel)
+	[D1, D2] = get_diameters(count, contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_per_pixel, draw=True, writer=None)
 
 	Input:
 	 'count' - A constant integer that tells which iteration the main code is on
@@ -36,69 +35,51 @@ def get_diameters(count,contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_pe
 		respect to the center of mass pixel location as the origin
 	 'km_per_pixel' = A conversion factor used to convert from number of 
 		pixels to number of kilometers (km)
+	 'draw' - If True, the diameters are drawn on 'im', which is written
+		out as drawn_diameters_<count>.png in the results folder. If
+		False, nothing is drawn or written
+	 'writer' - An ImageWriter to write the image in the background; if
+		None, it is written before returning
 	
 	Output:
 	 'D1' - A vector of minimum diameters, in terms of kilometers (km) 
 	 'D2' - A vector of maximum diameters, in terms of kilometers (km)
 	"""
 
-	# Pre-allocate space for vectors and arrays
-	angle1 = np.zeros([len(radii), len(radii)])
-	angle2 = np.zeros([len(radii), len(radii)])
-	angle_diff = np.zeros([len(radii),len(radii)])
-
-	# Go through each radius
-	for cur_idx in range(0,len(radii)):
-		# Set the current x1, y1 values for this round of the for loop
-		x1 = cur_x0[cur_idx]
-		y1 = cur_y0[cur_idx]
-		
-		# Calculate angle #1 from the origin to the x1, y1 point
-		angle1[cur_idx,:] = np.rad2deg(math.atan2(y1,x1))
-
-		# If angle #1 was calculated as a negative, add 360
-		if angle1[cur_idx,0]<0:
-			angle1[cur_idx,:] = angle1[cur_idx,:]+360
-		
-
-		# Calculate angle #2 for each radius corresponding to the first
-		#  set of radii
-		for iter_idx in range(0,len(radii)):
-			# Set the current x2, y2 values for this round of the internal
-			#  for loop
-			x2 = cur_x0[iter_idx]
-			y2 = cur_y0[iter_idx]
-
-			# Calculate angle #2 from the origin to the x2, y2 point
-			angle2[:,iter_idx] = np.rad2deg(math.atan2(y2,x2))
-
-			# If angle #1 was calculated as a negative, add 360
-			if angle2[0,iter_idx]<0:
-				angle2[:,iter_idx] = angle2[:,iter_idx]+360
-			
-
-	# Calculate the difference between angle1 and angle 2. To get the angles
-	#  with respect to difference from 180 degrees, subtract 180. 
-	angle_diff = np.abs(np.abs(angle1-angle2)-180)
-		
-    # Pre-allocate space for vectors
-	min_in_col = np.zeros(len(angle_diff[:,0]))
-	min_idx    = np.zeros(len(angle_diff[:,0]))
-
-	for curCol in range(0, len(angle_diff[:,0])):
-        # Get the minimum difference from 180, which should be the closest
-		#  to zero. 
-		min_in_col[curCol] = np.min(angle_diff[:,curCol])
-		# Get the index where the minimum difference is located
-		min_idx[curCol] = np.argmin(angle_diff[:,curCol])
-	
-	# Pre-allocate space for vector of diameters
-	diameters = np.zeros(len(min_idx))
+	# Calculate the angle from the origin to each contour point. If the
+	#  angle was calculated as a negative, add 360
+	angles = np.rad2deg(np.arctan2(cur_y0, cur_x0))
+	angles[angles < 0] = angles[angles < 0] + 360
+
+	# For each point, find the point whose angle differs by the closest to
+	#  180 degrees, i.e. the point closest to the opposite direction.
+	#  Sort the angles once (stable, so equal angles stay in index order),
+	#  and find where the opposite direction of each point falls in them
+	#  by binary search
+	n_points = len(radii)
+	order = np.argsort(angles, kind='mergesort')
+	sorted_angles = angles[order]
+	opposite = angles + 180
+	opposite[opposite >= 360] = opposite[opposite >= 360] - 360
+	insert_at = np.searchsorted(sorted_angles, opposite)
+
+	# The closest angle is one of its neighbours in the sorted angles,
+	#  going round past 360. Take two on each side, against rounding
+	candidates = (insert_at[:, np.newaxis] + np.arange(-2, 2)) % n_points
+	candidate_angles = sorted_angles[candidates]
+	# Among points with the same angle, use the one with the lowest index
+	candidate_idx = order[np.searchsorted(sorted_angles, candidate_angles, side='left')]
+
+	# Difference from 180 degrees, which should be the closest to zero
+	angle_diff = np.abs(np.abs(candidate_angles - angles[:, np.newaxis]) - 180)
+	min_in_col = np.min(angle_diff, axis=1)
+	# Get the index where the minimum difference is located, the lowest
+	#  index if there is more than one
+	min_idx = np.min(np.where(angle_diff == min_in_col[:, np.newaxis], candidate_idx, n_points), axis=1)
 
 	# For each radius, get the corresponding radius that goes through the 
 	#  center of mass and completes the diameter
-	for index in range(0, len(min_idx)):
-		diameters[index] = radii[index] + radii[min_idx[index]]
+	diameters = radii + radii[min_idx]
 
 	# D1 is the minimum diameter in the mass
 	# D2 is the maximum diameter in the mass
@@ -106,6 +87,9 @@ def get_diameters(count,contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_pe
 	D1 = np.min(diameters) * km_per_pixel
 	D2 = np.max(diameters) * km_per_pixel
 
+	if not draw:
+		return D1, D2
+
 	max_idx_diam = np.argmax(diameters)
 	min_idx_diam = np.argmin(diameters)
 	
@@ -126,7 +110,11 @@ def get_diameters(count,contours, im, x_com, y_com, radii, cur_x0, cur_y0, km_pe
 	cv2.line(im, pt2mdd, (int(round(x_com)),int(round(y_com))), (255,0,0), thickness=1, lineType=8, shift=0)
 
 	path = sys.path[0]
-	cv2.imwrite(path[:-4] + '/results/' + 'drawn_diameters_' + str(count) + '.png', im)
+	filename = path[:-4] + '/results/' + 'drawn_diameters_' + str(count) + '.png'
+	if writer is None:
+		cv2.imwrite(filename, im)
+	else:
+		writer.write(filename, im)
 
 	
 	return D1, D2                                    
@@ -0,0 +1,140 @@
+"""
+Name: get_info_cached
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import os
+import hashlib				# for keying the cache on file contents
+import numpy as np			# numpy for array operations
+
+from get_info_from_txt import get_info_from_txt
+
+# Outputs of get_info_from_txt, in order; each is cached as <name>.npy
+cache_columns = ['treal_string', 'treal', 'A', 'D1', 'D2', 'Ph', 'Tb', 'P0',
+                 'maxPh', 'maxT', 'Pp', 'Z', 'uk', 'u']
+
+# Changed whenever the cached columns or their units change
+cache_version = '1'
+
+
+def get_file_hash(filename):
+    # SHA-1 of the contents of a file, read in blocks
+    sha = hashlib.sha1()
+    f = open(filename, 'rb')
+    block = f.read(1048576)
+    while block:
+        sha.update(block)
+        block = f.read(1048576)
+    f.close()
+    return sha.hexdigest()
+
+
+def read_cache_meta(meta_filename):
+    # Dictionary of the key = value lines of a cache meta file
+    meta = {}
+    if os.path.isfile(meta_filename):
+        f = open(meta_filename, 'r')
+        for line in f:
+            if ' = ' in line:
+                key, value = line.rstrip('\n').split(' = ', 1)
+                meta[key] = value
+        f.close()
+    return meta
+
+
+def write_cache_meta(meta_filename, meta):
+    f = open(meta_filename + '.tmp', 'w')
+    for key in sorted(meta):
+        f.write(key + ' = ' + meta[key] + '\n')
+    f.close()
+    os.rename(meta_filename + '.tmp', meta_filename)
+
+
+def get_info_cached(data_filename, delimeter = None, window = 15, cache_dir = None):
+    """
+    [treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_cached(data_filename, delimeter = None, window = 15, cache_dir = None)
+
+    Description: This function gives the same outputs as get_info_from_txt,
+     but keeps the unit-converted columns of each input file in a binary
+     cache, one .npy file per column. When the cache is valid, the text
+     file is not parsed, and the columns are memory-mapped read-only
+     rather than read.
+
+     The cache of a file is keyed by its path. It is valid if the file
+     has the modification time and size it had when cached, or, failing
+     that, the same SHA-1 hash of its contents. Otherwise the file is
+     parsed again and the cache rewritten.
+
+    Input:
+     'data_filename' - As for get_info_from_txt
+     'delimeter' - As for get_info_from_txt. If None, it is set by the
+        file extension
+     'window' - Only the last 'window' records are returned, 15 by
+        default. If None, all records are returned. The cache always holds
+        all records
+     'cache_dir' - Directory in which caches are kept. By default, a
+        directory '.mer_cache' next to the input file
+
+    Output:
+     As for get_info_from_txt. The arrays are read-only.
+    """
+    data_filename = os.path.abspath(data_filename)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(data_filename), '.mer_cache')
+    file_cache = os.path.join(cache_dir, hashlib.sha1(data_filename.encode('utf-8')).hexdigest())
+    meta_filename = os.path.join(file_cache, 'meta.txt')
+
+    stat = os.stat(data_filename)
+    mtime = repr(stat.st_mtime)
+    size = str(stat.st_size)
+
+    # Check whether the cache is valid
+    meta = read_cache_meta(meta_filename)
+    valid = (meta.get('version') == cache_version and
+             meta.get('path') == data_filename and
+             meta.get('delimeter') == repr(delimeter))
+    if valid and (meta.get('mtime') != mtime or meta.get('size') != size):
+        # The file was touched or replaced; keep the cache if the
+        #  contents are the same
+        file_hash = get_file_hash(data_filename)
+        valid = meta.get('sha1') == file_hash
+        if valid:
+            meta['mtime'] = mtime
+            meta['size'] = size
+            write_cache_meta(meta_filename, meta)
+
+    if not valid:
+        # Parse the file and write the cache. The meta file is removed
+        #  first and written last, so an interrupted write is not used
+        file_hash = get_file_hash(data_filename)
+        outputs = get_info_from_txt(data_filename, delimeter=delimeter, window=None)
+        if not os.path.isdir(file_cache):
+            os.makedirs(file_cache)
+        if os.path.isfile(meta_filename):
+            os.remove(meta_filename)
+        for name, values in zip(cache_columns, outputs):
+            np.save(os.path.join(file_cache, name + '.npy'), np.asarray(values))
+        write_cache_meta(meta_filename, {'version': cache_version, 'path': data_filename,
+                                         'delimeter': repr(delimeter), 'mtime': mtime,
+                                         'size': size, 'sha1': file_hash})
+
+    # Memory-map each column, and take the window as a view
+    outputs = []
+    for name in cache_columns:
+        column_filename = os.path.join(file_cache, name + '.npy')
+        try:
+            values = np.load(column_filename, mmap_mode='r')
+        except ValueError:
+            # An empty column cannot be memory-mapped
+            values = np.load(column_filename)
+        if window is not None:
+            # A non-negative start, as negative starts beyond the length
+            #  are wrapped round by some numpy versions' memmap
+            values = values[max(len(values) - window, 0):]
+        outputs.append(values)
+
+    return tuple(outputs)
@@ -7,11 +7,135 @@ Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
 """
 
+import itertools			# for reading the file in chunks
 import numpy as np			# numpy for array operations
 
-def get_info_from_txt(data_filename, delimeter = ' '):
+# File extensions of input files, and the delimeter used in each
+delimeters = {'.ssv': ' ', '.csv': ',', '.tsv': '\t'}
+
+
+def _count_fields(lines, delimeter):
+    """
+    counts = _count_fields(lines, delimeter)
+
+    Description: Counts the fields of each line, as the runs of characters
+     that are neither white space nor the delimeter, without a loop over
+     the lines.
+
+    Input:
+     'lines' - List of lines of the file, each ending in a newline except
+        perhaps the last
+     'delimeter' - Field separation character
+
+    Output:
+     'counts' - Array of the number of fields of each line
     """
-    [treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_from_txt(data_filename, delimeter = ' ')
+    text = ''.join(lines)
+    if not text.endswith('\n'):
+        text = text + '\n'
+    chars = np.frombuffer(text, dtype=np.uint8)
+    separator = np.zeros(256, dtype=bool)
+    separator[[ord(c) for c in ' \t\r\n\v\f' + delimeter]] = True
+    is_sep = separator[chars]
+    # A field starts at a character that follows a separator
+    starts = ~is_sep
+    starts[1:] &= is_sep[:-1]
+    # Number of starts before the end of each line
+    ends = np.searchsorted(np.flatnonzero(starts), np.flatnonzero(chars == ord('\n')))
+    return np.diff(np.concatenate(([0], ends)))
+
+
+def read_info_table(data_filename, delimeter = None, window = None, chunk_rows = 100000):
+    """
+    [treal_string, data_matrix] = read_info_table(data_filename, delimeter = None, window = None, chunk_rows = 100000)
+
+    Description: This function reads the records of an input file in one
+     pass, a chunk of rows at a time, converting each chunk with numpy
+     rather than row by row.
+
+    Input:
+     'data_filename' - A file with information on the volcanic ash cloud
+        and surrounding atmosphere, with one line of headers
+     'delimeter' - Field separation character: ' ' or '\t' (any white
+        space), or e.g. ','. If None, it is set by the file extension (.ssv, .csv,
+        .tsv), and is white space for any other extension
+     'window' - If given, only the last 'window' records are returned
+     'chunk_rows' - Number of rows converted at a time, which bounds the
+        memory used for the text of the file
+
+    Output:
+      'treal_string' - An array of the time strings of each record,
+        exactly as in the file (YYYYMMDDHHMMSS)
+      'data_matrix' - An array of the records, one row per record and one
+        column per field, in the units of the file. Column 0 is the time
+        as a float
+    """
+    if delimeter is None:
+        ext = data_filename[data_filename.rfind('.'):]
+        delimeter = delimeters.get(ext, ' ')
+
+    # Rows are converted with numpy's C parser, which splits on the
+    #  separator and any white space around it. For delimeters other
+    #  than white space, the end of each row is made into a separator
+    if delimeter in (' ', '\t'):
+        sep = ' '
+    else:
+        sep = delimeter
+
+    f = open(data_filename, 'r')
+    # The number of fields is set by the line of headers
+    ncol = len(f.readline().replace(delimeter, ' ').split())
+
+    data_chunks = []
+    line_number = 1         # of the last line read
+    while True:
+        lines = list(itertools.islice(f, chunk_rows))
+        if len(lines) == 0:
+            break
+        # Every record must have as many fields as the headers, so that
+        #  no column is shifted into the next; blank lines are skipped
+        counts = _count_fields(lines, delimeter)
+        bad = np.nonzero((counts != ncol) & (counts != 0))[0]
+        if len(bad) > 0:
+            f.close()
+            raise ValueError(data_filename + ': line ' + str(line_number + bad[0] + 1) + ' has ' +
+                             str(counts[bad[0]]) + ' fields, not ' + str(ncol))
+        line_number += len(lines)
+        if np.any(counts == 0):
+            lines = [line for line, count in zip(lines, counts) if count != 0]
+            if len(lines) == 0:
+                continue
+        if sep == ' ':
+            text = ''.join(lines)
+        else:
+            text = sep.join([line.rstrip() for line in lines])
+        values = np.fromstring(text, dtype=float, sep=sep)
+        # A field that is not a number stops the parser early
+        if len(values) != len(lines) * ncol:
+            f.close()
+            raise ValueError(data_filename + ': records must all have ' + str(ncol) + ' numeric fields')
+        data_chunks.append(values.reshape(-1, ncol))
+    f.close()
+
+    if len(data_chunks) == 0:
+        data_matrix = np.zeros([0, ncol])
+    else:
+        data_matrix = np.concatenate(data_chunks)
+
+    # The time is an integer, held exactly by a float up to 2^53, so its
+    #  string is exact
+    treal_string = data_matrix[:, 0].astype(np.int64).astype(str)
+
+    if window is not None:
+        treal_string = treal_string[-window:]
+        data_matrix = data_matrix[-window:]
+
+    return treal_string, data_matrix
+
+
+def get_info_from_txt(data_filename, delimeter = ' ', window = 15):
+    """
+    [treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_from_txt(data_filename, delimeter = ' ', window = 15)
     
     Description: This function opens a text file to 
      get information from previous algorithms or from radionde data, 
@@ -24,7 +148,9 @@ def get_info_from_txt(data_filename, delimeter = ' '):
      'delimeter' - Indicates field separation character. By default, 
         white space. If the input is a .csv file,
         the delimeter should be ',' a comma. In other cases, it may be a
-        '\t', for tab.
+        '\t', for tab. If None, it is set by the file extension.
+     'window' - Only the last 'window' records of the file are used,
+        15 by default. If None, all records are used.
 
     Output:
       'treal_string' - A string of the time the image was taken, 
@@ -49,48 +175,22 @@ def get_info_from_txt(data_filename, delimeter = ' '):
       'uk' - Vector of wind speed in knots at Z (knots)
       'u' - Vector of wind speed in m/s at Z (m/s)
     """
-    # Open the text file and read each line into a string
-    # Open file
-    f = open(data_filename, 'r')
-    # Read in each line of the file; each line is a string
-    data_strings = f.readlines()
-    # Get the number of data strings which will equal the number of rows in the .txt file
-    nRows = len(data_strings)
-
-    # Pre-allocate space for the data 
-    data_matrix = np.zeros([nRows-1, 12], dtype=float)
-
-    # Get the data from the data strings into a matrix of values
-    treal_string = [] # begins a list for the treal_string
-    for index in range(0,len(data_matrix)):
-        # Do not count the first line of headers
-        current_string = data_strings[index+1]
-        # Search the current string for the index of the new line character
-        newline_index = current_string.index('\n')
-        # Get rid of the \n character in each string
-        no_newline_string = current_string[0:newline_index]
-        # Split the string at the spaces
-        current_row = no_newline_string.split(delimeter)
-        # Put the separated string into the current row of the data matrix
-        data_matrix[index,:] = current_row
-        # Append the first element of the current row (YYYYDDDHHMMSS) to treal_string
-        treal_string.append(current_row[0])
+    # Read the time strings and the matrix of values
+    treal_string, data_matrix = read_info_table(data_filename, delimeter=delimeter, window=window)
 
     # Define each output for the function from the data in data_matrix
-    treal = data_matrix[-15:,0]         # Time img was taken
-    A =  data_matrix[-15:,1]            # Area of plume (km^2)
-    D1 = data_matrix[-15:,2]            # Diameter 1 (km)
-    D2 = data_matrix[-15:,3]            # Diameter 2 (km)
-    Ph = data_matrix[-15:,4] * 0.3048   # Plume spreading height (input ft -> m)
-    Tb = data_matrix[-15:,5] + 273.15   # Plume brightness temperature (input C -> K)
-    P0 = data_matrix[-15:,6] * 100.     # Pressure at height Ph (input hPa -> Pa)
-    maxPh = data_matrix[-15:, 7] * 0.3048 # Max plume height where maxT (input ft -> m)
-    maxT = data_matrix[-15:,8] + 273.15 # (Min) temp at maxPh (input C -> K)
-    Pp = data_matrix[-15:,9] * 100.     # Pressure at maxPh (input hPa -> Pa)
-    Z = data_matrix[-15:,10] * 0.3048   # Plume height where wind speed measured (input ft -> m)
-    uk = data_matrix[-15:,11]           # Wind speed (knots)
-
-    f.close()                           # close file
+    treal = data_matrix[:,0]            # Time img was taken
+    A =  data_matrix[:,1]               # Area of plume (km^2)
+    D1 = data_matrix[:,2]               # Diameter 1 (km)
+    D2 = data_matrix[:,3]               # Diameter 2 (km)
+    Ph = data_matrix[:,4] * 0.3048      # Plume spreading height (input ft -> m)
+    Tb = data_matrix[:,5] + 273.15      # Plume brightness temperature (input C -> K)
+    P0 = data_matrix[:,6] * 100.        # Pressure at height Ph (input hPa -> Pa)
+    maxPh = data_matrix[:, 7] * 0.3048  # Max plume height where maxT (input ft -> m)
+    maxT = data_matrix[:,8] + 273.15    # (Min) temp at maxPh (input C -> K)
+    Pp = data_matrix[:,9] * 100.        # Pressure at maxPh (input hPa -> Pa)
+    Z = data_matrix[:,10] * 0.3048      # Plume height where wind speed measured (input ft -> m)
+    uk = data_matrix[:,11]              # Wind speed (knots)
 
     # Legacy
     u = uk * 514444./1000000.           # Wind speed (m/s)
@@ -1,175 +1,287 @@
 """
 Name: get_probabilities
-Version: 0.3
-Date: 24 November 2017
+Version: 0.4
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
 """
-import matplotlib.pyplot as plt
+from fractions import Fraction		# exponents given as ratios
 from scipy import stats		# used for t-test
-import scipy				# used to generate random normal distribution
 import numpy as np			# numpy for array operations
 
-def get_probabilities(c, a, one_stdev_err, probabilities_txt_filename):
+# Exponents to test, as strings
+default_exponents = ['4/9', '10/9', '4/3', '3/2']
+# default_exponents = ['2/9', '5/9', '2/3', '3/4']
+
+def get_rng(seed=None):
+	"""
+	rng = get_rng(seed=None)
+
+	Description: This function makes the random number generator used to
+	 draw samples: a numpy Generator if this numpy has one, otherwise a
+	 RandomState. The same seed gives the same samples.
+
+	Input:
+	 'seed' - Seed of the generator; None for a fresh, unpredictable seed
+
+	Output:
+	 'rng' - The random number generator
 	"""
-	[ output_txt_file ] = get_probabilities(c, a, one_stdev_err, probabilities_txt_filename)
+	default_rng = getattr(np.random, 'default_rng', None)
+	if default_rng is not None:
+		return default_rng(seed)
+	return np.random.RandomState(seed)
+
+def sample_t_tests(a, sd_a, popmean, n=100, runs=2, seed=None, chunk_size=2**22):
+	"""
+	[ t_stat, prob ] = sample_t_tests(a, sd_a, popmean, n=100, runs=2, seed=None, chunk_size=2**22)
+
+	Description: This function draws, for each fit, run and exponent, a
+	 sample of n values of alpha from a normal distribution of mean 'a' and
+	 standard deviation 'sd_a', and performs a t-test that the mean of the
+	 sample is the exponent, as scipy.stats.ttest_1samp does. All samples
+	 are drawn in one (fits x runs x exponents x n) set, in pieces of at
+	 most chunk_size values, so that n can be millions; only the sums over
+	 each sample are kept.
+
+	Input:
+	 'a' - Vector of the power constant of each fit
+	 'sd_a' - Vector of the one standard deviation error of each a
+	 'popmean' - Vector of the exponents to test
+	 'n' - Number of samples in each t-test, at least 2
+	 'runs' - Number of t-tests of each fit and exponent, each with
+		samples of its own
+	 'seed' - Seed of the random number generator, for reproducible
+		probabilities; None for a fresh seed
+	 'chunk_size' - Largest number of samples drawn at once
+
+	Output:
+	 't_stat' - Array of t-statistics (fits x runs x exponents)
+	 'prob' - Array of two-sided probabilities (fits x runs x exponents)
+	"""
+	a = np.atleast_1d(np.asarray(a, dtype=float))
+	sd_a = np.atleast_1d(np.asarray(sd_a, dtype=float))
+	popmean = np.atleast_1d(np.asarray(popmean, dtype=float))
+	if n < 2:
+		raise ValueError('At least 2 samples are needed for a t-test')
+
+	rng = get_rng(seed)
+	shape = (len(a), runs, len(popmean))
+
+	# Samples are a + sd_a*z, with z standard normal. Sum z and z^2 over
+	#  the samples, a piece at a time
+	sum_z = np.zeros(shape)
+	sum_z2 = np.zeros(shape)
+	step = max(chunk_size // int(np.prod(shape)), 1)
+	for start in range(0, n, step):
+		z = rng.standard_normal(shape + (min(step, n - start),))
+		sum_z += z.sum(axis=-1)
+		sum_z2 += (z*z).sum(axis=-1)
+
+	# Mean and standard deviation (ddof = 1) of each sample
+	mean_z = sum_z / n
+	sd_z = np.sqrt(np.maximum(sum_z2 - n*mean_z*mean_z, 0.) / (n - 1))
+	mean = a[:,np.newaxis,np.newaxis] + sd_a[:,np.newaxis,np.newaxis]*mean_z
+	sd = np.abs(sd_a)[:,np.newaxis,np.newaxis]*sd_z
+
+	# t-statistics and two-sided probabilities of all the t-tests
+	t_stat = (mean - popmean) / (sd / np.sqrt(n))
+	prob = 2.*stats.t.sf(np.abs(t_stat), n - 1)
+
+	return t_stat, prob
+
+def analytic_t_tests(a, sd_a, popmean, n=100):
+	"""
+	[ t_stat, prob, likelihood ] = analytic_t_tests(a, sd_a, popmean, n=100)
+
+	Description: This function gives, without sampling, the t-tests that
+	 sample_t_tests estimates: the sample of n values of alpha is taken to
+	 have exactly mean 'a' and standard deviation 'sd_a', so that
+	 t = (a - exponent)*sqrt(n)/sd_a, and the probability is that of the t
+	 distribution with n - 1 degrees of freedom. It also gives the
+	 likelihood of each exponent under the normal distribution of alpha,
+	 normalized over the exponents tested, so that the exponents can be
+	 compared with each other.
+
+	Input:
+	 'a' - Vector of the power constant of each fit
+	 'sd_a' - Vector of the one standard deviation error of each a
+	 'popmean' - Vector of the exponents to test
+	 'n' - Number of samples the t-tests stand for, at least 2
+
+	Output:
+	 't_stat' - Array of t-statistics (fits x exponents)
+	 'prob' - Array of two-sided probabilities (fits x exponents)
+	 'likelihood' - Array of relative likelihoods of the exponents, which
+		sum to 1 for each fit (fits x exponents)
+	"""
+	a = np.atleast_1d(np.asarray(a, dtype=float))[:,np.newaxis]
+	sd_a = np.abs(np.atleast_1d(np.asarray(sd_a, dtype=float)))[:,np.newaxis]
+	popmean = np.atleast_1d(np.asarray(popmean, dtype=float))
+	if n < 2:
+		raise ValueError('At least 2 samples are needed for a t-test')
+
+	z = (a - popmean) / sd_a
+	t_stat = z*np.sqrt(n)
+	prob = 2.*stats.t.sf(np.abs(t_stat), n - 1)
+
+	# Likelihood ratios, from logs so that far exponents do not underflow
+	log_likelihood = -0.5*z*z
+	likelihood = np.exp(log_likelihood - log_likelihood.max(axis=1)[:,np.newaxis])
+	likelihood = likelihood / likelihood.sum(axis=1)[:,np.newaxis]
+
+	return t_stat, prob, likelihood
+
+def ordinal(number):
+	# 1st, 2nd, 3rd, 4th ...
+	if 10 <= number % 100 <= 20:
+		return str(number) + 'th'
+	return str(number) + {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+
+def get_probabilities(c, a, one_stdev_err, probabilities_txt_filename, n=100, runs=2, seed=None, exponents=None,
+		method='sample'):
+	"""
+	[ t_stat, prob ] = get_probabilities(c, a, one_stdev_err, probabilities_txt_filename, n=100, runs=2, seed=None,
+		exponents=None, method='sample')
 
 	Description: This function generates a sample set of data from the
 	 alpha value and its standard deviation and performs a series of 
 	 t-tests to evaluate the probability that the data fits different
-	 power law relationships (2/9, 5/9, 2/3, 3/4)
+	 power law relationships (4/9, 10/9, 4/3, 3/2), with sample_t_tests.
+	 Each fit is tested 'runs' times, to check that the probabilities
+	 converge. With method = 'analytic', the probabilities are instead
+	 calculated directly from alpha and its standard deviation, with
+	 analytic_t_tests; they are the same every time, and the relative
+	 likelihood of each exponent is also written out.
 
 	Input:
 	 'c' - The constant in y = cx^a, can be a vector of constant c's 
 		if > 1 fit eqn
 	 'a' - The power constant in y = cx^a, can be a vector of alphas 
 		if > 1 fit eqn
-	 'one_stdev_err' - An array of one standard deviation errors of a and c
+	 'one_stdev_err' - An array of one standard deviation errors of a and c,
+		one row per fit if > 1 fit eqn
 	 'probabilities_txt_filename' - A filename that the probabilities will 
 		be saved to in a results folder
+	 'n' - Number of samples to draw from the distribution of alpha
+	 'runs' - Number of times each probability is estimated
+	 'seed' - Seed of the random number generator, for reproducible
+		probabilities; None for a fresh seed
+	 'exponents' - List of the exponents to test, as strings ('4/3');
+		None for the default exponents
+	 'method' - 'sample' to t-test samples drawn from the distribution of
+		alpha, or 'analytic' for the closed form
 	 
 	Output:
 	 output_txt_file - The text file output
+	 't_stat' - Array of t-statistics (fits x runs x exponents); with
+		method = 'analytic', there is one run
+	 'prob' - Array of probabilities (fits x runs x exponents)
 	"""
 
 	# Specify number of samples to draw from distribution of parameter values.
-        # Small number (currently n = 100) is chosen to reflect generally small number of
-        # times at which we have satellite acquisition.
-        # Could be changed to actual number of satellite image pairs in analysis, but note
-        # that no probability can be calculated for n < 2.
-	n = 100
-	# Specify exponents to test as strings
-	strings = ['4/9', '10/9', '4/3', '3/2']
-	# Specify exponents to test as floats, in the same order as above
-	popmean_ar = np.array([4./9., 10./9., 4./3., 3./2.])
-#	popmean_ar = np.array([2./9., 5./9., 2./3., 3./4.])
+	# Small number (default n = 100) is chosen to reflect generally small number of
+	# times at which we have satellite acquisition.
+	# Could be changed to actual number of satellite image pairs in analysis, but note
+	# that no probability can be calculated for n < 2.
+	# Specify exponents to test as strings, and as floats in the same order
+	if exponents is None:
+		exponents = default_exponents
+	popmean_ar = np.array([float(Fraction(exponent)) for exponent in exponents])
+
+	# One row of c, a and their errors per fit
+	scalar = np.ndim(a) == 0
+	c = np.atleast_1d(c)
+	a = np.atleast_1d(a)
+	one_stdev_err = np.atleast_2d(one_stdev_err)
+
+	if method == 'sample':
+		t_stat, prob = sample_t_tests(a, one_stdev_err[:,1], popmean_ar, n=n, runs=runs, seed=seed)
+	elif method == 'analytic':
+		t_stat, prob, likelihood = analytic_t_tests(a, one_stdev_err[:,1], popmean_ar, n=n)
+		t_stat = t_stat[:,np.newaxis,:]
+		prob = prob[:,np.newaxis,:]
+	else:
+		raise ValueError("method must be 'sample' or 'analytic'")
 
 	# Open the .txt file for writing
 	f = open(probabilities_txt_filename, 'w')
 
-	# If alpha is a scalar of type float
-	if (type(a) == np.float64) or (type(a) == np.float) or (type(a) == float):
-		
+	fit_names = ['FIRST', 'SECOND', 'THIRD', 'FOURTH', 'FIFTH']
+	for fit in range(0, len(a)):
+		if not scalar:
+			if fit > 0:
+				f.write('\n')
+			if fit < len(fit_names):
+				f.write('RESULTS FOR THE ' + fit_names[fit] + ' FIT:\n')
+			else:
+				f.write('RESULTS FOR FIT ' + str(fit + 1) + ':\n')
+
 		# Write the information to the .txt file
-		f.write('c, constant = ' + str(c) + '\n')
-		f.write('stdev in c = ' + str(one_stdev_err[0]) + ' \n')
-		f.write('a, alpha = ' + str(a) + '\n')
-		f.write('stdev in a = ' + str(one_stdev_err[1]) + '\n')
-
-		# Test the population mean as the different probabilities
-		for mean_idx in range(0,len(popmean_ar)):
-			popmean = popmean_ar[mean_idx]
-			
-			# Pre-allocate space for t-statistics and probabilities
-			t_stat = np.zeros(2)	
-			prob = np.zeros(2)
-			# Generate arrays from n samples, stddev, and expected value
-			#  of a. Use the sample array and test the probabilities that 
-			#  the distribution follows each power law value 
-			for index in range(0,2):
-				array = one_stdev_err[1]*scipy.random.standard_normal(n)+a
-				# num_numbers = len(set(array))					
-				hist, edges = np.histogram(array, bins=100)
-				x = range(100)
-				y = hist
-                                # uncomment to see the histograms
-				# plt.plot(x,y)
-				# plt.show()
-
-				t_stat[index], prob[index] = scipy.stats.ttest_1samp(array, popmean)
-			
-			# Write out the data to the .txt file
+		f.write('c, constant = ' + str(c[fit]) + '\n')
+		f.write('stdev in c = ' + str(one_stdev_err[fit,0]) + ' \n')
+		f.write('a, alpha = ' + str(a[fit]) + '\n')
+		f.write('stdev in a = ' + str(one_stdev_err[fit,1]) + '\n')
 
-			prob_string = '1st run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[0])
-			f.write(prob_string + '\n')
-			prob_string = '2nd run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[1])
-			f.write(prob_string + '\n')
+		for mean_idx in range(0, len(popmean_ar)):
+			if method == 'analytic':
+				f.write('Analytic: probability that alpha is ' + exponents[mean_idx] + ' is ' + \
+						str(prob[fit,0,mean_idx]) + '\n')
+				f.write('Analytic: t-statistic that alpha is ' + exponents[mean_idx] + ' is ' + \
+						str(t_stat[fit,0,mean_idx]) + '\n')
+				f.write('Analytic: relative likelihood that alpha is ' + exponents[mean_idx] + ' is ' + \
+						str(likelihood[fit,mean_idx]) + '\n')
+				continue
+
+			# Write out the data to the .txt file
+			for run in range(0, runs):
+				prob_string = ordinal(run + 1) + ' run: probability that alpha is ' + exponents[mean_idx] + \
+						' is ' + str(prob[fit,run,mean_idx])
+				f.write(prob_string + '\n')
 
 			# Write if the probability values converged to two sig figs
-			if np.absolute(prob[0] - prob[1]) < 0.1:
-				f.write('Probability does converge to two significant figures. \n')
-			else:
-				f.write('Probability does not converge to two significant figures. \n')
-	
-			t_stat_string = '1st run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[0])
-			f.write(t_stat_string + '\n')
-			t_stat_string = '2nd run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[1])
-			f.write(t_stat_string + '\n')
-			f.write(t_stat_string + '\n')
-
-	elif type(a) == np.ndarray:
-		f.write('RESULTS FOR THE FIRST FIT:\n')
-
-		f.write('c, constant = ' + str(c[0]) + '\n')
-		f.write('stdev in c = ' + str(one_stdev_err[0,0]) + ' \n')
-		f.write('a, alpha = ' + str(a[0]) + '\n')
-		f.write('stdev in a = ' + str(one_stdev_err[0,1]) + '\n')
-
-		for mean_idx in range(0,len(popmean_ar)):
-			popmean = popmean_ar[mean_idx]
-				
-			t_stat = np.zeros(2)
-			prob = np.zeros(2)
-			for index in range(0,2):
-				array = one_stdev_err[0,1]*scipy.random.standard_normal(n)+a[0]
-				t_stat[index], prob[index] = scipy.stats.ttest_1samp(array, popmean)
-
-                        prob_string = '1st run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[0])
-                        f.write(prob_string + '\n')
-			prob_string = '2nd run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[1])
-			f.write(prob_string + '\n')
-	
-			if np.absolute(prob[0] - prob[1]) < 0.1:
+			if np.ptp(prob[fit,:,mean_idx]) < 0.1:
 				f.write('Probability does converge to two significant figures. \n')
 			else:
 				f.write('Probability does not converge to two significant figures. \n')
 
-			t_stat_string = '1st run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[0])
-			f.write(t_stat_string + '\n')
-			t_stat_string = '2nd run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[1])
-			f.write(t_stat_string + '\n')
-			f.write(t_stat_string + '\n')
-
-		f.write('\nRESULTS FOR THE SECOND FIT:\n')
-
-		f.write('c, constant = ' + str(c[1]) + '\n')
-		f.write('stdev in c = ' + str(one_stdev_err[1,0]) + ' \n')
-		f.write('a, alpha = ' + str(a[1]) + '\n')
-		f.write('stdev in a = ' + str(one_stdev_err[1,1]) + '\n')
-
-		for mean_idx in range(0,len(popmean_ar)):
-			popmean = popmean_ar[mean_idx]
-			
-			t_stat = np.zeros(2)
-			prob = np.zeros(2)
-			for index in range(0,2):
-				array = one_stdev_err[1,1]*scipy.random.standard_normal(n)+a[1]
-				t_stat[index], prob[index] = scipy.stats.ttest_1samp(array, popmean)
-
-                        prob_string = '1st run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[0])
-                        f.write(prob_string + '\n')
-			prob_string = '2nd run: probability that alpha is '+ strings[mean_idx] + ' is ' + str(prob[1])
-			f.write(prob_string + '\n')
-
-			if np.absolute(prob[0] - prob[1]) < 0.1:
-				f.write('Probability does converge to two significant figures. \n')
-			else:
-				f.write('Probability does not converge to two significant figures. \n')
+			for run in range(0, runs):
+				t_stat_string = ordinal(run + 1) + ' run: t-statistic that alpha is ' + exponents[mean_idx] + \
+						' is ' + str(t_stat[fit,run,mean_idx])
+				f.write(t_stat_string + '\n')
 
-			t_stat_string = '1st run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[0])
-			f.write(t_stat_string + '\n')
-			t_stat_string = '2nd run: t-statistic that alpha is ' + strings[mean_idx] + ' is ' + str(t_stat[0])
-			f.write(t_stat_string + '\n')
-			f.write(t_stat_string + '\n')
-	
 	# Close the .txt file now that all writing to it is complete
 	f.close()
 
+	return t_stat, prob
+
 if __name__ == '__main__':
 	c = 154
 	a = 0.776
 	one_stdev_err = [123.12, 0.0481]
 	probabilities_txt_filename = 'probs_text.txt'
 
-	get_probabilities(c, a, one_stdev_err, probabilities_txt_filename)
+	get_probabilities(c, a, one_stdev_err, probabilities_txt_filename, seed=0)
+
+	# Check the t-tests against scipy, and time a million samples per test
+	import time
+	popmean_ar = np.array([4./9., 10./9., 4./3., 3./2.])
+	t_stat, prob = sample_t_tests([a], [0.0481], popmean_ar, n=1000, runs=2, seed=1)
+	z = get_rng(1).standard_normal((1, 2, 4, 1000))
+	t_ref, prob_ref = stats.ttest_1samp(a + 0.0481*z, popmean_ar, axis=-1)
+	print 'Matches ttest_1samp: ', np.allclose(t_stat, t_ref, rtol=1e-8), np.allclose(prob, prob_ref, rtol=1e-6, atol=1e-300)
+
+	start = time.time()
+	t_stat, prob = sample_t_tests([a, 1.1], [0.0481, 0.45], popmean_ar, n=1000000, runs=2, seed=2)
+	print 'n = 1000000, 2 fits: ', time.time() - start, ' s'
+	print prob
+
+	# The analytic t-statistics are the centre of the sampled ones
+	start = time.time()
+	t_analytic, prob_analytic, likelihood = analytic_t_tests([a, 1.1], [0.0481, 0.45], popmean_ar, n=100)
+	print 'analytic: ', time.time() - start, ' s'
+	t_stat, prob = sample_t_tests([a, 1.1], [0.0481, 0.45], popmean_ar, n=100, runs=2000, seed=3)
+	print 'analytic t: ', t_analytic
+	print 'median sampled t: ', np.median(t_stat, axis=1)
+	print 'relative likelihoods: ', likelihood
@@ -9,9 +9,9 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 import numpy as np			# numpy for array operations
 
-def get_radii(contours, x_com, y_com):
+def get_radii(contours, x_com, y_com, dtype=float):
 	"""
-	[ radii, cur_x0, cur_y0 ] = get_radii(contours, x_com, y_com)
+	[ radii, cur_x0, cur_y0 ] = get_radii(contours, x_com, y_com, dtype=float)
 
 	Description: This function gets all radii by calculating Euclidean
 	 distance from the x,y center of mass coordinate to the coordinates of
@@ -22,6 +22,8 @@ def get_radii(contours, x_com, y_com):
 	 'contours' - an array of image contour pixel locations 
 	 'x_com' - the x-coordinate pixel location for the center of mass
 	 'y_com' - the y-coordinate pixel location for the center of mass
+	 'dtype' - The float type of the outputs. np.float32 halves the
+		memory used for large contours, at single precision
 
 	Output:
 	 'radii' - A vector of radii that describe each radius from the center
@@ -32,26 +34,13 @@ def get_radii(contours, x_com, y_com):
 	 'cur_y0' - A vector of the y locations of each contour pixel, with
 		respect to the center of mass pixel location as the origin 
 	"""
-	# Get the shape of contours to determine how much space to pre-allocate
-	r, c = contours.shape
-    
-	# Pre-allocate space
-	cur_x = np.zeros(r)
-	cur_y = np.zeros(r)
-	radii = np.zeros(r)
-
-	# Get radius for each contour coordinate 
-	for curRow in range(0, r): 
-		cur_row = contours[curRow, :]
-		cur_x[curRow] = cur_row[0]
-		cur_y[curRow] = cur_row[1]
-    
-		# Use Euclidean distance equation to get radius distance
-		radii[curRow] = np.sqrt((x_com - cur_x[curRow])**2 + (y_com - cur_y[curRow])**2)
-
 	# Get x,y locations with respect to the center of mass as 
-	#  an origin point (0,0)
-	cur_x0 = cur_x - x_com
-	cur_y0 = cur_y - y_com
+	#  an origin point (0,0), for all contour coordinates at once
+	contours = np.asarray(contours)
+	cur_x0 = (contours[:, 0] - x_com).astype(dtype, copy=False)
+	cur_y0 = (contours[:, 1] - y_com).astype(dtype, copy=False)
+
+	# Use Euclidean distance equation to get radius distance
+	radii = np.sqrt(cur_x0**2 + cur_y0**2)
 	
 	return radii, cur_x0, cur_y0
@@ -8,13 +8,23 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 """
 
-def get_rhos(P0,  Pp, maxT, Tb, Rd = 287.):
+import logging				# verbosity levels
+import numpy as np			# numpy for array operations
+
+from mer_logging import logger
+from isa_table import pressure_at_height, pressure_at_temperature
+
+def get_rhos(P0,  Pp, maxT, Tb, Rd = 287., fill_missing = False, Ph = None, maxPh = None):
     """
-    [ rhobar, rhogas] = get_rhos_N(P0, Pp, maxT, Tb, Rd = 287.)
+    [ rhobar, rhogas] = get_rhos_N(P0, Pp, maxT, Tb, Rd = 287., fill_missing = False, Ph = None, maxPh = None)
 
     Description: This function takes in parameters to calculate the 
      plume density at the neutral buoyancy height, 
      and the density of the gas in the cloud. Modified from Pouget et al. (2013, JVGR).
+     Where there is no sounding, missing (NaN) pressures can be filled from
+     the standard atmosphere, looked up in the tables of isa_table: at the
+     heights Ph and maxPh if they are given, else at the temperatures Tb
+     and maxT.
 
     Input:
      'P0' - Vector of pressure of plume at neutral buoyancy height, Ph, 
@@ -26,6 +36,12 @@ def get_rhos(P0,  Pp, maxT, Tb, Rd = 287.):
      'Tb' - Vector of plume spreading temperature at the level of neutral 
         buoyancy, "brightness temperature" in each image (K)
      'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'fill_missing' - True to fill missing pressures from the standard
+        atmosphere (Pa)
+     'Ph' - Vector of plume spreading height at the level of neutral
+        buoyancy (m), to fill P0; None to fill it from Tb
+     'maxPh' - Vector of maximum plume height (m), to fill Pp; None to
+        fill it from maxT
 
     Output:
      'rhobar' - Plume density at the neutral buoyancy height
@@ -34,14 +50,33 @@ def get_rhos(P0,  Pp, maxT, Tb, Rd = 287.):
 
     # This version does a very straightforward estimate from measurements
     # Assumes brightness temperatures can be used directly
+    if fill_missing:
+        P0 = fill_pressure(P0, Ph, Tb)
+        Pp = fill_pressure(Pp, maxPh, maxT)
+
     # Calculate rhobar
     rhobar = P0 / (Tb * Rd)
     # Calculate rhogas
     rhogas = Pp / (maxT * Rd)
 
-    print "------------------ Density check ------------------------"
-    print "Estimated bulk density of cloud = ", rhobar
-    print "Estimated gas density = ", rhogas    
-    print "---------------------------------------------------------"
+    # The arrays are only formatted if they are to be seen
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("------------------ Density check ------------------------")
+        logger.debug("Estimated bulk density of cloud =  %s", rhobar)
+        logger.debug("Estimated gas density =  %s", rhogas)
+        logger.debug("---------------------------------------------------------")
 
     return rhobar, rhogas
+
+def fill_pressure(P, height, T):
+    # Pressure of the standard atmosphere where P is NaN: at the height if
+    #  it is known, else at the temperature
+    P = np.asarray(P, dtype=float)
+    missing = np.isnan(P)
+    if not missing.any():
+        return P
+    if height is not None:
+        standard = pressure_at_height(height)
+    else:
+        standard = pressure_at_temperature(T)
+    return np.where(missing, standard, P)
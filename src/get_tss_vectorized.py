@@ -0,0 +1,121 @@
+"""
+Name: get_tss_vectorized
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+
+
+def get_epoch_seconds(treal_string):
+    """
+    epoch = get_epoch_seconds(treal_string)
+
+    Description: This function converts times in the format YYYYMMDDHHMMSS
+     to seconds since 1970-01-01 00:00:00, for all times at once, using
+     numpy datetime64 calendar arithmetic. Times with a month, day, hour,
+     minute or second out of range are flagged rather than rolled over.
+
+    Input:
+     'treal_string' - A vector of times, as strings (YYYYMMDDHHMMSS) or as
+        the numbers those strings represent
+
+    Output:
+     'epoch' - A vector of int64 seconds since 1970-01-01 00:00:00
+     'valid' - A boolean vector, False where the time is not a real date
+    """
+    t = np.atleast_1d(np.asarray(treal_string))
+    if t.dtype.kind in 'SU':
+        t = t.astype(np.int64)
+    else:
+        t = np.round(t).astype(np.int64)
+
+    # Split into year, month, day, hour, minute and second
+    Y = t // 10000000000
+    O = t // 100000000 % 100
+    D = t // 1000000 % 100
+    H = t // 10000 % 100
+    M = t // 100 % 100
+    S = t % 100
+
+    # Calendar arithmetic: first day of the month, then add days
+    months = ((Y - 1970) * 12 + (O - 1)).astype('datetime64[M]')
+    month_start = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    days = month_start + (D - 1)
+
+    epoch = days.astype('datetime64[s]').astype(np.int64) + H * 3600 + M * 60 + S
+
+    valid = ((O >= 1) & (O <= 12) & (D >= 1) & (D <= days_in_month) &
+             (H <= 23) & (M <= 59) & (S <= 59))
+
+    return epoch, valid
+
+
+def read_start_epoch(start_filename):
+    """
+    start = read_start_epoch(start_filename)
+
+    Description: This function reads the start time of the eruption from a
+     start file, and raises a ValueError if it is not a real date.
+
+    Input:
+     'start_filename' - A .txt file with the start time of the eruption
+        in the format YYYYMMDDHHMMSS
+
+    Output:
+     'start' - The start time in int64 seconds since 1970-01-01 00:00:00
+    """
+    f = open(start_filename, 'r')
+    start_time = f.read().strip()
+    f.close()
+    epoch, valid = get_epoch_seconds([start_time])
+    if not valid[0]:
+        raise ValueError(start_filename + ': start time ' + start_time + ' is not a real date')
+    return epoch[0]
+
+
+def get_tss_vectorized(treal_string, start_filename):
+    """
+    tss = get_tss_vectorized(treal_string, start_filename)
+
+    Description: This function gets the time in seconds from the beginning
+     of the eruption, doing the work of get_YODHMS and get_tss in one
+     step. Differences in month and year are handled by the calendar,
+     including leap years, so eruptions over the end of a month or year
+     get the right times.
+
+     The beginning of the eruption is assumed to be the time that
+     the original image was taken, unless there is a start file with
+     a start time derived from different data.
+
+    Input:
+     'treal_string' - A vector of the time each image was taken
+        (YYYYMMDDHHMMSS), as strings or numbers
+     'start_filename' - A .txt file with the start time of the eruption
+        in the format YYYYMMDDHHMMSS. If start_filename == 'None', the
+        start time of the eruption is assumed to be the time that the
+        original image was taken
+
+    Output:
+     'tss' - A vector of number of seconds since the eruption start;
+        NaN where the time of the image is not a real date. A ValueError
+        is raised if the start time is not a real date
+    """
+    epoch, valid = get_epoch_seconds(treal_string)
+
+    if start_filename == 'None':
+        if not valid[0]:
+            raise ValueError('time ' + str(np.atleast_1d(treal_string)[0]) +
+                             ' of the first image, the start of the eruption, is not a real date')
+        start = epoch[0]
+    else:
+        start = read_start_epoch(start_filename)
+
+    tss = (epoch - start).astype(float)
+    tss[~valid] = np.nan
+
+    return tss
@@ -0,0 +1,63 @@
+"""
+Name: image_writer
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import threading			# background writing thread
+try:
+    import Queue as queue	# python 2
+except ImportError:
+    import queue
+import cv2					# image processing operations
+
+
+class ImageWriter(object):
+    """
+    writer = ImageWriter(maxsize=8)
+    writer.write(filename, im)
+    writer.close()
+
+    Description: Writes diagnostic images to file in a background thread,
+     so that PNG encoding and disk I/O overlap with the computation. At
+     most 'maxsize' images wait to be written; write() waits for room
+     when the queue is full, which bounds the memory used. An image must
+     not be changed after it is passed to write().
+
+    Input:
+     'maxsize' - Number of images that can wait to be written
+
+    Attributes:
+     'errors' - A list of (filename, error) for images that could not be
+        written
+    """
+
+    def __init__(self, maxsize=8):
+        self.queue = queue.Queue(maxsize)
+        self.errors = []
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            filename, im = item
+            try:
+                if not cv2.imwrite(filename, im):
+                    self.errors.append((filename, 'not written'))
+            except Exception as e:
+                self.errors.append((filename, str(e)))
+
+    def write(self, filename, im):
+        self.queue.put((filename, im))
+
+    def close(self):
+        # Write out the images waiting in the queue, and stop the thread
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,178 @@
+"""
+Name: incremental_MER
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+
+from get_tss_vectorized import get_epoch_seconds, read_start_epoch
+from get_N import get_N
+from get_MERs_vectorized import get_MERs_vectorized
+
+
+class IncrementalMER(object):
+    """
+    estimator = IncrementalMER(start_filename='None', Rd=287., g=-9.81)
+    result = estimator.update(row)
+
+    Description: Estimates MER and cumulative mass one satellite image
+     at a time, as each image arrives. Only the previous image and running
+     totals are kept, so each update takes the same time however long the
+     eruption has been going. The physics are those of get_MERs_cloudtype,
+     and feeding it every row of an input file gives the same cloudtype,
+     MERs and mass as running main_cloudtype on the whole file.
+
+    Input:
+     'start_filename' - A .txt file with the start time of the eruption
+        (YYYYMMDDHHMMSS), as used by get_YODHMS. If start_filename == 'None',
+        the start time is the time of the first image passed to update.
+        A ValueError is raised if the start time is not a real date
+     'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+
+    Attributes:
+     'count' - Number of images seen
+     'total_mass' - Total mass of ash so far (kg)
+     'duration' - Eruption duration so far, the time of the maximum
+        cumulative mass (s)
+     'mean_MERp' - Mean MER of particles after the first image (kg/s)
+     'std_MERp' - Standard deviation of MER of particles (kg/s), 0 if
+        fewer than 3 images
+    """
+
+    def __init__(self, start_filename='None', Rd=287., g=-9.81):
+        self.Rd = Rd
+        self.g = g
+        self.start = None
+        if start_filename != 'None':
+            self.start = read_start_epoch(start_filename)
+
+        # State carried from the previous image
+        self.count = 0
+        self.prev = None
+        self.mass = 0.0
+
+        # Running summary of the eruption
+        self.total_mass = 0.0
+        self.duration = 0.0     # set by the first image
+        self._n_MERp = 0        # non-NaN MERpa after the first image
+        self._sum_MERp = 0.0
+        self._n_all = 0         # Welford accumulators over all MERpa
+        self._mean_all = 0.0
+        self._m2_all = 0.0
+
+    def update(self, row):
+        """
+        result = update(row)
+
+        Description: Adds one image to the estimate.
+
+        Input:
+         'row' - One record of the input file, in its units:
+            (time, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk), with
+            time as YYYYMMDDHHMMSS, heights in ft, temperatures in C,
+            pressures in hPa and wind speed in knots
+
+        Output:
+         'result' - A dictionary of 'tss', 'L', 'MERpl', 'MERpli', 'MERpa',
+            'MERpai', 'cloudtype' and 'mass' for this image, as in
+            get_MERs_cloudtype
+        """
+        treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk = row
+
+        # Unit conversions of get_info_from_txt
+        Ph = Ph * 0.3048
+        Tb = Tb + 273.15
+        P0 = P0 * 100.
+        maxPh = maxPh * 0.3048
+        maxT = maxT + 273.15
+        Pp = Pp * 100.
+        u = uk * 514444./1000000.
+
+        # Time since eruption start
+        epoch, valid = get_epoch_seconds([treal])
+        epoch = epoch[0]
+        if self.start is None:
+            if not valid[0]:
+                raise ValueError('time ' + str(treal) +
+                                 ' of the first image, the start of the eruption, is not a real date')
+            self.start = epoch
+        tss = float(epoch - self.start) if valid[0] else np.nan
+
+        # Densities and buoyancy frequency of this image
+        rhobar = P0 / (Tb * self.Rd)
+        rhogas = Pp / (maxT * self.Rd)
+        N = get_N(np.array([Tb]), np.array([maxT]), np.array([Ph]), np.array([maxPh]), g = self.g)[0]
+
+        cur = (D1, D2, rhobar, tss, A, N, u, rhogas)
+        if self.prev is None:
+            pair = [np.array([v]) for v in cur]
+        else:
+            pair = [np.array([p, c]) for p, c in zip(self.prev, cur)]
+        L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass = \
+            [v[-1] for v in get_MERs_vectorized(*pair)]
+
+        # Cumulative mass, which restarts when no mass is added
+        if self.prev is not None:
+            mass_cur_img = MERpa * (tss - self.prev[3])
+            if mass_cur_img > 0.0:
+                self.mass = mass_cur_img + self.mass
+            else:
+                self.mass = 0.0
+        mass = self.mass
+
+        # Running summary; the first image is the maximum until mass is
+        #  added, as with the argmax of get_MERs_cloudtype
+        if self.prev is None or mass > self.total_mass:
+            self.total_mass = mass
+            self.duration = tss
+        if self.prev is not None and not np.isnan(MERpa):
+            self._n_MERp += 1
+            self._sum_MERp += MERpa
+        if not np.isnan(MERpa):
+            self._n_all += 1
+            delta = MERpa - self._mean_all
+            self._mean_all += delta / self._n_all
+            self._m2_all += delta * (MERpa - self._mean_all)
+
+        self.prev = cur
+        self.count += 1
+
+        return {'tss': tss, 'L': L, 'MERpl': MERpl, 'MERpli': MERpli, 'MERpa': MERpa,
+                'MERpai': MERpai, 'cloudtype': cloudtype, 'mass': mass}
+
+    @property
+    def mean_MERp(self):
+        if self._n_MERp == 0:
+            return np.nan
+        return self._sum_MERp / self._n_MERp
+
+    @property
+    def std_MERp(self):
+        if self.count < 3 or self._n_all == 0:
+            return 0.0
+        return np.sqrt(self._m2_all / self._n_all)
+
+
+if __name__ == '__main__':
+    # Replay the Tinakula test file one image at a time
+    import os
+    path = os.getcwd()
+    data_filename = path[:-4] + '/test/' + 'test_tinakula_1_ftc.ssv'
+
+    estimator = IncrementalMER()
+    f = open(data_filename, 'r')
+    f.readline()
+    for line in f:
+        fields = line.split()
+        result = estimator.update([fields[0]] + [float(v) for v in fields[1:]])
+        print result['tss'], int(result['cloudtype']), result['MERpa'], result['mass']
+    f.close()
+
+    print "Tot. mass ash = ", estimator.total_mass, " kg"
+    print "mean MERp = ", int(estimator.mean_MERp), " +/- ", int(estimator.std_MERp), " kg/s "
+    print "eruption duration = ", int(estimator.duration), " s"
@@ -7,10 +7,20 @@
     Given that we are getting pressure, height, density = isa(temperature),
     This only works for ICAO troposphere, below 11 km
     M. Bursik 1 Dec 2017
+
+    isa_from_height, isa_from_pressure and isa_from_temperature take arrays,
+    and cover every layer of the tables up to 47 km, giving NaN outside.
+    Above the tropopause temperature does not set height, so lookups from
+    temperature stay in the troposphere.
+    18 Oct 2026
 """    
 
 import sys
 import math
+import logging
+import numpy as np
+
+from mer_logging import logger
 
 g = 9.80665
 R = 287.00
@@ -24,21 +34,164 @@ def cal(p0, t0, a, h0, t1):
         p1 = p0 * math.exp(- g * h1 / R / t0)
     return h1, p1
 
+# Lapse rate of each layer (K/m) and temperature at its top (K)
+a = [-0.0065, 0, 0.001, 0.0028]
+t = [216.65, 216.65, 228.65, 270.65]
+p0 = 108900.0   #These values from wikipedia, noting that ISA starts at h0 = -611.0
+t0 = 292.15
+h0 = -610.0
+# Thickness of the isothermal layer, 11 - 20 km (m)
+dh_iso = 9000.0
+
+def isa_layers():
+    """
+    [ hb, tb, pb, lapse, h_top ] = isa_layers()
+
+    Description: This function gets the height, temperature and pressure
+     at the base of each layer of the standard atmosphere, from the
+     lapse rates and layer top temperatures of the tables.
+
+    Output:
+     'hb' - Vector of the height of the base of each layer (m)
+     'tb' - Vector of the temperature at the base of each layer (K)
+     'pb' - Vector of the pressure at the base of each layer (Pa)
+     'lapse' - Vector of the lapse rate of each layer (K/m)
+     'h_top' - Height of the top of the last layer (m)
+    """
+    hb = [h0]
+    tb = [t0]
+    pb = [p0]
+    for i in range(len(a)):
+        if a[i] != 0:
+            h1, p1 = cal(pb[i], tb[i], a[i], hb[i], t[i])
+        else:
+            h1 = hb[i] + dh_iso
+            p1 = pb[i] * math.exp(- g * dh_iso / R / tb[i])
+        hb.append(h1)
+        tb.append(t[i])
+        pb.append(p1)
+    return np.array(hb[:-1]), np.array(tb[:-1]), np.array(pb[:-1]), np.array(a, dtype=float), hb[-1]
+
+layers = isa_layers()
+
+def isa_from_height(height):
+    """
+    [ temperature, pressure, density ] = isa_from_height(height)
+
+    Description: This function gets the standard atmosphere at each
+     height, in every layer of the tables.
+
+    Input:
+     'height' - Array of heights (m)
+
+    Output:
+     'temperature' - Array of temperatures (K)
+     'pressure' - Array of pressures (Pa)
+     'density' - Array of densities (kg/cu m)
+     All are NaN where the height is outside the layers, or NaN
+    """
+    hb, tb, pb, lapse, h_top = layers
+    height = np.asarray(height, dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (height >= hb[0]) & (height <= h_top)
+    h = np.where(valid, height, hb[0])
+
+    # Layer of each height, and the base of that layer
+    i = np.clip(np.searchsorted(hb, h, side='right') - 1, 0, len(hb) - 1)
+    dh = h - hb[i]
+    temperature = tb[i] + lapse[i] * dh
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pressure = np.where(lapse[i] != 0,
+                            pb[i] * (temperature / tb[i]) ** (-g / np.where(lapse[i] != 0, lapse[i], 1.) / R),
+                            pb[i] * np.exp(- g * dh / R / tb[i]))
+
+    temperature = np.where(valid, temperature, np.nan)
+    pressure = np.where(valid, pressure, np.nan)
+    return temperature, pressure, pressure / (R * temperature)
+
+def isa_from_pressure(pressure):
+    """
+    [ temperature, altitude, density ] = isa_from_pressure(pressure)
+
+    Description: This function gets the height and temperature of the
+     standard atmosphere at each pressure, in every layer of the tables.
+
+    Input:
+     'pressure' - Array of pressures (Pa)
+
+    Output:
+     'temperature' - Array of temperatures (K)
+     'altitude' - Array of heights (m)
+     'density' - Array of densities (kg/cu m)
+     All are NaN where the pressure is outside the layers, or NaN
+    """
+    hb, tb, pb, lapse, h_top = layers
+    p_top = isa_from_height(h_top)[1]
+    pressure = np.asarray(pressure, dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (pressure <= pb[0]) & (pressure >= p_top)
+    p = np.where(valid, pressure, pb[0])
+
+    # Layer of each pressure; pressure falls with height
+    i = np.clip(len(pb) - np.searchsorted(pb[::-1], p, side='left') - 1, 0, len(pb) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = p / pb[i]
+        temperature = np.where(lapse[i] != 0,
+                               tb[i] * ratio ** (- np.where(lapse[i] != 0, lapse[i], 1.) * R / g),
+                               tb[i])
+        altitude = np.where(lapse[i] != 0,
+                            hb[i] + (temperature - tb[i]) / np.where(lapse[i] != 0, lapse[i], 1.),
+                            hb[i] - R * tb[i] / g * np.log(ratio))
+
+    temperature = np.where(valid, temperature, np.nan)
+    altitude = np.where(valid, altitude, np.nan)
+    return temperature, altitude, pressure / (R * temperature)
+
+def isa_from_temperature(temperature):
+    """
+    [ pressure, altitude, density ] = isa_from_temperature(temperature)
+
+    Description: This function gets the pressure and height of the
+     standard atmosphere at each temperature, as isa does, for arrays.
+     Only the troposphere is used, since higher up the same temperature
+     is found at more than one height.
+
+    Input:
+     'temperature' - Array of temperatures (K)
+
+    Output:
+     'pressure' - Array of pressures (Pa)
+     'altitude' - Array of heights (m)
+     'density' - Array of densities (kg/cu m)
+     All are NaN where the temperature is outside [217, 292] K, or NaN
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (temperature >= t[0]) & (temperature <= t0)
+    temp = np.where(valid, temperature, t0)
+    altitude = (temp - t0)/a[0] + h0
+    pressure = p0 * (temp / t0) ** (-g / a[0] / R)
+
+    pressure = np.where(valid, pressure, np.nan)
+    altitude = np.where(valid, altitude, np.nan)
+    return pressure, altitude, pressure / (R * temperature)
+
 def isa(temperature):
-    a = [-0.0065, 0, 0.001, 0.0028]
-    t = [216.65, 216.65, 228.65, 270.65]
-    p0 = 108900.0   #These values from wikipedia, noting that ISA starts at h0 = -611.0
-    t0 = 292.15
-    h0 = -610.0
+    if np.ndim(temperature) > 0:
+        # Arrays of temperatures: NaN rather than messages out of range
+        pressure, altitude, density = isa_from_temperature(temperature)
+        return np.asarray(temperature, dtype=float), pressure, altitude, density
+
     if temperature < t[0] or temperature > t0:
-        print("temperature must be in [217, 292]. suspect rapid rise/undercooling.")
+        logger.warning("temperature must be in [217, 292]. suspect rapid rise/undercooling.")
         return
 
     else:
         altitude, pressure = cal(p0, t0, a[0], h0, temperature)
         density = pressure / (R * temperature)
-        strformat = 'Temperature: {0:.2f} \nPressure: {1:.2f} \nAltitude: {2:.4f} \nDensity: {3:.4f}'
-        print(strformat.format(temperature, pressure, altitude, density))
+        if logger.isEnabledFor(logging.DEBUG):
+            strformat = 'Temperature: {0:.2f} \nPressure: {1:.2f} \nAltitude: {2:.4f} \nDensity: {3:.4f}'
+            logger.debug(strformat.format(temperature, pressure, altitude, density))
         return temperature, pressure, altitude, density
 
 if __name__ == '__main__':
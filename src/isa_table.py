@@ -0,0 +1,197 @@
+"""
+Name: isa_table
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import os
+import numpy as np			# numpy for array operations
+
+from isa import isa_from_height, layers, t
+
+# Tables already built in this process, by resolution
+tables = {}
+
+# Changed whenever the contents of a saved table change
+cache_version = '1'
+
+# Names of the layer constants of isa_layers, saved with a table so that
+#  a table built from other constants is not used
+layer_names = ['hb', 'tb', 'pb', 'lapse', 'h_top']
+
+
+def get_isa_table(resolution=1.0, cache_file=None):
+    """
+    table = get_isa_table(resolution=1.0, cache_file=None)
+
+    Description: This function gets a table of the standard atmosphere of
+     isa at evenly spaced heights at most 'resolution' m apart, through all
+     its layers, so that lookups are interpolations rather than evaluations
+     of the formulas.
+     The table is built once per process for each resolution. With a
+     cache file, it is also saved to disk, and read back in later runs
+     if it has the same resolution, version and layers of isa.
+
+    Input:
+     'resolution' - Height step of the table (m)
+     'cache_file' - A .npz file to keep the table in ('.npz' is added if
+        missing); None to keep it in memory only
+
+    Output:
+     'table' - A dictionary of the vectors 'height' (m), 'temperature' (K),
+        'pressure' (Pa) and 'density' (kg/cu m), in order of height
+    """
+    key = float(resolution)
+    if key in tables:
+        return tables[key]
+
+    # np.savez adds the extension, so it is added here too, for the
+    #  saved file to be found again
+    if cache_file is not None and not cache_file.endswith('.npz'):
+        cache_file = cache_file + '.npz'
+
+    table = None
+    if cache_file is not None and os.path.exists(cache_file):
+        saved = np.load(cache_file)
+        valid = ('version' in saved.files and str(saved['version']) == cache_version and
+                 float(saved['resolution']) == key and
+                 all(name in saved.files and np.array_equal(saved[name], value)
+                     for name, value in zip(layer_names, layers)))
+        if valid:
+            table = dict((name, saved[name]) for name in ['height', 'temperature', 'pressure', 'density'])
+        saved.close()
+
+    if table is None:
+        hb, tb, pb, lapse, h_top = layers
+        height = np.linspace(hb[0], h_top, int(np.ceil((h_top - hb[0]) / key)) + 1)
+        temperature, pressure, density = isa_from_height(height)
+        table = {'height': height, 'temperature': temperature, 'pressure': pressure, 'density': density}
+        if cache_file is not None:
+            saved = dict(zip(layer_names, layers))
+            saved.update(table)
+            np.savez(cache_file, resolution=key, version=cache_version, **saved)
+
+    tables[key] = table
+    return table
+
+
+def lookup(x, xp, fp):
+    # Interpolate, with NaN outside the table; xp must be increasing
+    return np.interp(np.asarray(x, dtype=float), xp, fp, left=np.nan, right=np.nan)
+
+
+def lookup_height(height, table, name):
+    # Interpolate in the table at each height. The heights of the table
+    #  are evenly spaced, so the row of each height is found directly,
+    #  rather than by searching
+    heights = table['height']
+    values = table[name]
+    height = np.asarray(height, dtype=float)
+    with np.errstate(invalid='ignore'):
+        valid = (height >= heights[0]) & (height <= heights[-1])
+    position = (np.where(valid, height, heights[0]) - heights[0]) / (heights[1] - heights[0])
+    row = np.minimum(position.astype(int), len(heights) - 2)
+    fraction = position - row
+    result = values[row] + fraction * (values[row + 1] - values[row])
+    return np.where(valid, result, np.nan)
+
+
+def pressure_at_height(height, resolution=1.0):
+    """
+    pressure = pressure_at_height(height, resolution=1.0)
+
+    Description: Pressure of the standard atmosphere at each height,
+     interpolated in the table of get_isa_table; NaN outside the table.
+    """
+    return lookup_height(height, get_isa_table(resolution), 'pressure')
+
+
+def temperature_at_height(height, resolution=1.0):
+    """
+    temperature = temperature_at_height(height, resolution=1.0)
+
+    Description: Temperature of the standard atmosphere at each height,
+     interpolated in the table of get_isa_table; NaN outside the table.
+    """
+    return lookup_height(height, get_isa_table(resolution), 'temperature')
+
+
+def density_at_height(height, resolution=1.0):
+    """
+    density = density_at_height(height, resolution=1.0)
+
+    Description: Density of the standard atmosphere at each height,
+     interpolated in the table of get_isa_table; NaN outside the table.
+    """
+    return lookup_height(height, get_isa_table(resolution), 'density')
+
+
+def height_at_pressure(pressure, resolution=1.0):
+    """
+    height = height_at_pressure(pressure, resolution=1.0)
+
+    Description: Height of each pressure in the standard atmosphere,
+     interpolated in the table of get_isa_table; NaN outside the table.
+    """
+    table = get_isa_table(resolution)
+    return lookup(pressure, table['pressure'][::-1], table['height'][::-1])
+
+
+def troposphere(table):
+    # The part of the table up to the first height at or above the
+    #  tropopause, where temperature falls with height, in order of
+    #  increasing temperature
+    top = np.searchsorted(table['height'], layers[0][1], side='left') + 1
+    return dict((name, values[:top][::-1]) for name, values in table.items())
+
+
+def height_at_temperature(temperature, resolution=1.0):
+    """
+    height = height_at_temperature(temperature, resolution=1.0)
+
+    Description: Height of each temperature in the troposphere of the
+     standard atmosphere, interpolated in the table of get_isa_table;
+     NaN outside [217, 292] K, as for isa.
+    """
+    tropo = troposphere(get_isa_table(resolution))
+    return lookup(temperature, tropo['temperature'], tropo['height'])
+
+
+def pressure_at_temperature(temperature, resolution=1.0):
+    """
+    pressure = pressure_at_temperature(temperature, resolution=1.0)
+
+    Description: Pressure at each temperature in the troposphere of the
+     standard atmosphere, interpolated in the table of get_isa_table;
+     NaN outside [217, 292] K, as for isa.
+    """
+    tropo = troposphere(get_isa_table(resolution))
+    return lookup(temperature, tropo['temperature'], tropo['pressure'])
+
+
+if __name__ == '__main__':
+    # Accuracy and speed of the table against the formulas of isa
+    import time
+    from isa import isa_from_temperature
+
+    start = time.time()
+    get_isa_table()
+    print 'table built: ', time.time() - start, ' s'
+
+    height = np.random.uniform(0., 40000., 1000000)
+    start = time.time()
+    exact = isa_from_height(height)[1]
+    formula_time = time.time() - start
+    start = time.time()
+    table = pressure_at_height(height)
+    table_time = time.time() - start
+    print 'pressure at 1e6 heights: formulas ', formula_time, ' s, table ', table_time, ' s'
+    print 'largest relative error: ', np.max(np.abs(table - exact) / exact)
+
+    temperature = np.random.uniform(t[0], 292.15, 1000000)
+    exact = isa_from_temperature(temperature)[0]
+    print 'pressure at temperatures, largest relative error: ', \
+        np.max(np.abs(pressure_at_temperature(temperature) - exact) / exact)
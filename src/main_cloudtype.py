@@ -1,11 +1,18 @@
 """
 Name: main_cloudtype
 Description: Wrapper program to get data and calculate mass eruption rate (MER) for a growing volcanic cloud.
-Version: 0.5
-Date: 23 November 2017
+Version: 0.6
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
+
+Use:
+ > python main_cloudtype.py [--headless]
+
+ With --headless, the figures are not shown but saved to the results
+ folder, by a separate plotting process, so that no display is needed
+ and the calculation does not wait on the plots.
 """
 
 # Import python libraries
@@ -22,15 +29,15 @@ import datetime
 # Import modules in the src directory
 from get_MERs_cloudtype import *
 from get_N import *
-from get_YODHMS import *
 from get_info_from_txt import *
 from get_rhos import *
-from get_tss import *
+from get_tss_vectorized import *
 from plot_MER import *
 from plot_tss_vs_A import *
 from power_fit_coeffs import *
 from get_probabilities import *
 from write_MER_data import *
+from plot_worker import *
 
 if __name__ == '__main__':
 
@@ -38,6 +45,11 @@ if __name__ == '__main__':
     path = os.getcwd()
     now = datetime.datetime.now()
 
+    # Show the figures, or save them from a plotting process
+    headless = '--headless' in sys.argv[1:]
+    if headless:
+        plotter = PlotWorker()
+
     # Specify the needed input filenames
 
     # Filename containing majority of data
@@ -65,11 +77,8 @@ if __name__ == '__main__':
     # Get info from txt
     [ treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = get_info_from_txt(data_filename, delimeter=' ')
 
-    # Get YODHMS
-    [ Y, O, D, H, M, S, Y0, O0, D0, H0, M0, S0] = get_YODHMS(treal_string, start_filename)
-
     # Get tss
-    tss = get_tss(Y, O, D, H, M, S, Y0, O0, D0, H0, M0, S0)
+    tss = get_tss_vectorized(treal_string, start_filename)
 
     # Get rhos
     [ rhobar, rhogas] = get_rhos(P0, Pp, maxT, Tb, Rd = 287.)
@@ -84,17 +93,30 @@ if __name__ == '__main__':
     write_MER_data(tss, A, maxPh, Ph, rhobar, rhogas, MERpa, mass, cloudtype, MER_csv_file)
 
     # Plot Time vs. Area
-    plot_tss_vs_A(tss, A, L, N, u, rhobar)
+    if headless:
+        plotter.plot('plot_tss_vs_A', tss, A, L, N, u, rhobar, filename=path[:-4] + '/results/' + 'tss_vs_A.png')
+    else:
+        plot_tss_vs_A(tss, A, L, N, u, rhobar)
 
     # Get and plot power function coefficients 
-    [ x_tss, y_A, power_func, c, a, one_stdev_err ] = power_fit_coeffs(A,tss,cloudtype)
+    [ x_tss, y_A, power_func, c, a, one_stdev_err ] = power_fit_coeffs(A,tss,cloudtype, plot=not headless)
+    if headless:
+        cloud_change = list(np.flatnonzero(np.diff(cloudtype)) + 1)
+        plotter.plot('plot_power_fit', x_tss, y_A, c, a, cloud_change, filename=path[:-4] + '/results/' + 'power_fit.png')
     # Get best-fit power function probabilities
     get_probabilities(c, a, one_stdev_err, probabilities_txt_filename)
 
     # Plot time vs. MER
     # plotMER(MERpl, tss, 'Time(s)', 'MER of cloud (kg/s)', 'Time vs. MER of cloud')
     # plotMER(MERpli, tss, 'Time(s)', 'Mass of puff, instantaneous source (kg)', 'Time vs. Estimated mass of puff')
-    plotMER(MERpa, tss, 'Time(s)', 'MER of particles (kg/s)', 'Time vs. MER of particles')
-    plotMER(mass, tss, 'Time(s)', 'Cum. mass of particles (kg)', 'Time vs. Mass of particles')
+    if headless:
+        plotter.plot('plotMER', MERpa, tss, 'Time(s)', 'MER of particles (kg/s)', 'Time vs. MER of particles',
+                     filename=path[:-4] + '/results/' + 'MERp.png')
+        plotter.plot('plotMER', mass, tss, 'Time(s)', 'Cum. mass of particles (kg)', 'Time vs. Mass of particles',
+                     filename=path[:-4] + '/results/' + 'mass.png')
+        plotter.close()
+    else:
+        plotMER(MERpa, tss, 'Time(s)', 'MER of particles (kg/s)', 'Time vs. MER of particles')
+        plotMER(mass, tss, 'Time(s)', 'Cum. mass of particles (kg)', 'Time vs. Mass of particles')
 
 
@@ -1,11 +1,26 @@
 """
 Name: main_diameters
 Description: Wrapper program to get diameters/radii across clouds from images.
-Version: 0.4
-Date: 27 November 2017
+Version: 0.6
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
+
+Use:
+ > python main_diameters.py [<input directory>] [-j <workers>] [--threads]
+        [--no-images] [--image-every <N>]
+
+ Cloud mask images in the input directory (the test directory by default)
+ whose names start with 'test_cloud' are processed in name order. With
+ -j, masks are processed by a pool of worker processes, or of threads with
+ --threads; each worker reads its image while the others compute, and
+ results are written in name order as before.
+
+ The images with the contours and diameters drawn on are diagnostics: with
+ --no-images none are drawn or written, and with --image-every N only those
+ of every Nth mask are. Without worker processes, the images are written by
+ a background thread while the next masks are processed.
 """
 
 # Import python libraries
@@ -16,59 +31,145 @@ import math
 from scipy import ndimage
 import os
 import csv
+import argparse
+import multiprocessing
+import multiprocessing.pool
 
 # Import modules from src directory
 from contours_com import *
 from get_radii import *
 from get_diameters import *
 from write_diameter_data import *
+from image_writer import *
 
 # I think it's good to declare this globally
 # who knows where it could be needed
 km_per_pixel = 4.75
 
+# Writer for the drawn images; None to write them in process_cloud_mask
+image_writer = None
+
+
+def process_cloud_mask(job):
+    """
+    [ area, D1, D2 ] = process_cloud_mask(job)
+
+    Description: This function gets the area and diameters of the cloud
+     in one cloud mask image, and if asked, writes out the image with the
+     contours and center of mass drawn on, and the image with the diameters
+     drawn on.
+
+    Input:
+     'job' - A (count, filename, results_path, draw) tuple: the number of
+        the image in the run, the cloud mask image file, the directory the
+        drawn images are written to, and whether to draw them
+
+    Output:
+     'area' - Area of the cloud (sq km)
+     'D1' - Minimum diameter of the cloud (km)
+     'D2' - Maximum diameter of the cloud (km)
+    """
+    count, filename, results_path, draw = job
+
+    # read in image of cloud mask
+    im = cv2.imread(filename)
+
+    # Get the contours, area and center of mass coordinates
+    contours, x_com, y_com, img, area = contours_com(im)
+    area = area * km_per_pixel * km_per_pixel
+
+    # Get every radius in cloud mask from contour to center of mass
+    radii, cur_x0, cur_y0 = get_radii(contours, x_com, y_com)
+
+    # Get the maximum and minimum diameters in the cloud mask
+    D1, D2 = get_diameters(count, contours, img, x_com, y_com, radii, cur_x0, cur_y0, km_per_pixel,
+                           draw=draw, writer=image_writer)
+
+    # Write out img with contours and center of mass drawn on
+    if draw:
+        contours_filename = results_path + 'contours_COM_' + os.path.basename(filename)
+        if image_writer is None:
+            cv2.imwrite(contours_filename, im)
+        else:
+            image_writer.write(contours_filename, im)
+
+    return area, D1, D2
+
+
+def init_worker():
+    # Each worker process uses one OpenCV thread, so that the pool does
+    #  not oversubscribe the cores
+    cv2.setNumThreads(1)
+
+
 if __name__ == '__main__':
 
     # Define the current path
     path = os.getcwd()
-    
+
+    parser = argparse.ArgumentParser(description='Get cloud diameters from cloud mask images.')
+    parser.add_argument('path_test', nargs='?', default=path[:-4] + '/test',
+                        help='directory of cloud mask images')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='number of workers; 0 for one per core (default: 1)')
+    parser.add_argument('--threads', action='store_true',
+                        help='use a pool of threads rather than processes')
+    parser.add_argument('--no-images', action='store_true',
+                        help='do not draw or write the diagnostic images')
+    parser.add_argument('--image-every', type=int, default=1, metavar='N',
+                        help='draw and write the images of every Nth mask only')
+    args = parser.parse_args()
+
     # Specify the needed output filenames
-    diameters_csv_file = path[:-4] + '/results/' + 'diameters.csv'
+    results_path = path[:-4] + '/results/'
+    diameters_csv_file = results_path + 'diameters.csv'
 
     # Define the path for the input test files
-    path_test = path[:-4] + '/test'
+    path_test = args.path_test
 
     # Determine which test images should be used as cloud masks
-    files = [f for f in os.listdir(path_test) if f.startswith('test_cloud')]
-
-    # Pre-allocate space for diameter vectors
-    area = np.zeros(len(files))
-    D1 = np.zeros(len(files))
-    D2 = np.zeros(len(files))
+    files = sorted([f for f in os.listdir(path_test) if f.startswith('test_cloud')])
+    every = max(args.image_every, 1)
+    jobs = [(count, path_test + '/' + files[count], results_path,
+             not args.no_images and count % every == 0) for count in range(0, len(files))]
 
     # Go through each cloud mask image
-    count=0
-    for index in range(0,len(files)):
-        # Get the filename with extension
-        filename = path_test + '/' + files[index]
-        # Heading is filename without extension
-        heading = files[index]
-        heading = heading[0:12]
-        # read in image of cloud mask
-        im = cv2.imread(filename)
-
-        # Get the contours, area and center of mass coordinates
-        contours, x_com, y_com, img, area[index] = contours_com(im)
-        area[index] = area[index] * km_per_pixel * km_per_pixel
-
-        # Get every radius in cloud mask from contour to center of mass
-        radii, cur_x0, cur_y0 = get_radii(contours, x_com, y_com)
-
-        # Get the maximum and minimum diameters in the cloud mask
-        D1[index], D2[index] = get_diameters(count,contours, img, x_com, y_com, radii, cur_x0, cur_y0, km_per_pixel)
-        count = count+1
-
-        # Write out img with contours and center of mass drawn on
-        cv2.imwrite(path[:-4] + '/results/' + 'contours_COM_' + files[index], im)
-        
+    workers = args.workers
+    if workers == 0:
+        workers = multiprocessing.cpu_count()
+
+    # Worker processes write their own images; otherwise a background
+    #  thread writes them
+    if not args.no_images and (workers <= 1 or args.threads):
+        image_writer = ImageWriter()
+
+    if workers <= 1:
+        results = [process_cloud_mask(job) for job in jobs]
+    else:
+        if args.threads:
+            # OpenCV releases the GIL while reading and processing images
+            pool = multiprocessing.pool.ThreadPool(workers)
+        else:
+            pool = multiprocessing.Pool(workers, initializer=init_worker)
+        try:
+            # imap gives the results in the order of the jobs
+            results = list(pool.imap(process_cloud_mask, jobs, chunksize=1))
+        except:
+            # Stop the remaining jobs when a worker fails
+            pool.terminate()
+            raise
+        finally:
+            pool.close()
+            pool.join()
+
+    if image_writer is not None:
+        image_writer.close()
+        for image_filename, error in image_writer.errors:
+            print 'Could not write ' + image_filename + ': ' + error
+
+    # Vectors of area and diameters, in the order of the files
+    area = np.array([result[0] for result in results])
+    D1 = np.array([result[1] for result in results])
+    D2 = np.array([result[2] for result in results])
+
     write_diameter_data(area, D1, D2, diameters_csv_file)
@@ -0,0 +1,41 @@
+"""
+Name: mer_logging
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import logging				# messages of the MER modules
+import sys
+
+# Messages are written to the screen as they were printed before. Per-image
+#  messages are at DEBUG level, summaries at INFO and problems at WARNING
+logger = logging.getLogger('umbrella_mer')
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+logger.propagate = False
+logger.setLevel(logging.DEBUG)
+
+# Verbosity by name
+verbosity_levels = {'quiet': logging.WARNING, 'summary': logging.INFO, 'verbose': logging.DEBUG}
+
+
+def set_verbosity(verbosity):
+    """
+    set_verbosity(verbosity)
+
+    Description: This function sets how much the MER modules write to the
+     screen. In 'quiet' mode only problems are written, and the arrays of
+     results are not formatted into text at all, which saves time in
+     batch runs.
+
+    Input:
+     'verbosity' - 'verbose' for every message, including those for each
+        image (the default), 'summary' for the summaries only, 'quiet' for
+        problems only; or a logging level
+    """
+    logger.setLevel(verbosity_levels.get(verbosity, verbosity))
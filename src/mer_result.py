@@ -0,0 +1,99 @@
+"""
+Name: mer_result
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+
+
+class MERResult(object):
+    """
+    result = MERResult(L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=None)
+    [ L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass ] = result
+
+    Description: The results of get_MERs_cloudtype and get_MERs_vectorized,
+     as arrays that can be read by name (result.MERpa), with the summary of
+     the eruption worked out only when asked for. It unpacks and indexes
+     as the 7 outputs did before, so existing code keeps working. Arrays
+     of more than one dimension have the images along the last axis, and
+     the summaries are then given for each row.
+
+    Attributes:
+     'L', 'MERpl', 'MERpli', 'MERpa', 'MERpai', 'cloudtype', 'mass' - As
+        the outputs of get_MERs_cloudtype
+     'tss' - The seconds since the eruption start of each image, or None
+     'total_mass' - Total mass of ash (kg)
+     'volume_DRE' - Estimated volume of ash, dense rock equivalent (km^3)
+     'mean_MERp' - Mean MER of particles after the first image (kg/s)
+     'std_MERp' - Standard deviation of MER of particles (kg/s), 0 if
+        fewer than 3 images
+     'duration' - Eruption duration, the time of the greatest cumulative
+        mass (s); needs 'tss'
+    """
+
+    __slots__ = ('L', 'MERpl', 'MERpli', 'MERpa', 'MERpai', 'cloudtype', 'mass', 'tss')
+    fields = ('L', 'MERpl', 'MERpli', 'MERpa', 'MERpai', 'cloudtype', 'mass')
+
+    def __init__(self, L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass, tss=None):
+        self.L = L
+        self.MERpl = MERpl
+        self.MERpli = MERpli
+        self.MERpa = MERpa
+        self.MERpai = MERpai
+        self.cloudtype = cloudtype
+        self.mass = mass
+        self.tss = tss
+
+    def __iter__(self):
+        return iter([getattr(self, name) for name in self.fields])
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    @property
+    def total_mass(self):
+        return np.max(self.mass, axis=-1)
+
+    @property
+    def volume_DRE(self):
+        return self.total_mass / 2500. / 1000000000.
+
+    @property
+    def mean_MERp(self):
+        return np.nanmean(self.MERpa[..., 1:], axis=-1)
+
+    @property
+    def std_MERp(self):
+        if np.shape(self.MERpa)[-1] < 3:
+            return np.zeros(np.shape(self.MERpa)[:-1])[()]
+        return np.nanstd(self.MERpa, axis=-1)
+
+    @property
+    def duration(self):
+        tss, mass = np.broadcast_arrays(np.asarray(self.tss, dtype=float), self.mass)
+        # The image of the greatest mass in each row, by indexing the rows
+        #  with open grids
+        rows = np.ix_(*[np.arange(k) for k in mass.shape[:-1]])
+        return tss[rows + (np.argmax(mass, axis=-1),)][()]
+
+    def as_array(self):
+        """
+        table = as_array()
+
+        Description: The results as a numpy structured array, one record
+         per image, with a field for 'tss' and each of the 7 outputs.
+        """
+        names = ('tss',) + self.fields
+        columns = [self.tss] + list(self)
+        columns = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in columns])
+        table = np.zeros(columns[0].shape, dtype=[(name, float) for name in names])
+        for name, column in zip(names, columns):
+            table[name] = column
+        return table
@@ -9,9 +9,9 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 import matplotlib.pyplot as plt 	# use for plotting and figures
 
-def plotMER(MER, tss, x_label='Time(s)', y_label='MER_type', title='Time vs. MER'):
+def plotMER(MER, tss, x_label='Time(s)', y_label='MER_type', title='Time vs. MER', filename=None):
     """
-    plot of Time vs. MER =  plotMER(MER, tss, x_label='Time(s)', y_label, title): 
+    plot of Time vs. MER =  plotMER(MER, tss, x_label='Time(s)', y_label, title, filename=None): 
 
     Description: Plots the time vs. MER  or estimated mass data.
 
@@ -22,6 +22,8 @@ def plotMER(MER, tss, x_label='Time(s)', y_label='MER_type', title='Time vs. MER
         the start of the eruption in seconds(s)
      'y_label' - The y-axis label of the plot, representing the MER ((m^3)/s) 
      'title' - The title of the plot
+     'filename' - If given, the plot is saved to this file and closed,
+        rather than shown
 
     Output: 
      plot of Time vs. MER
@@ -32,4 +34,8 @@ def plotMER(MER, tss, x_label='Time(s)', y_label='MER_type', title='Time vs. MER
     plt.xlabel(x_label)
     plt.ylabel(y_label)
     plt.title(title)
-    plt.show()
+    if filename is None:
+        plt.show()
+    else:
+        fig.savefig(filename)
+        plt.close(fig)
@@ -1,19 +1,18 @@
 """
 Name: plot_tss_vs_A
-Version: 0.1
-Date: 11 August 2015
+Version: 0.2
+Date: 18 October 2026
 Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
 Concept: Solene Pouget, Emile Jansons, Marcus Bursik
 Contact: Marcus Bursik mib@buffalo.edu
 """
 
 import matplotlib.pyplot as plt 	# use for plotting and figures
-import math							# math operations
 import numpy as np					# numpy for array operations
 
-def plot_tss_vs_A(tss, A, L, N, u, rhobar):
+def plot_tss_vs_A(tss, A, L, N, u, rhobar, filename=None, npoints=200):
     """
-    plot of Time vs. Area = plot_tss_vs_A(tss, A, L, N, u, rhobar)
+    plot of Time vs. Area = plot_tss_vs_A(tss, A, L, N, u, rhobar, filename=None, npoints=200)
 
     Description: This function plots Time vs. Area for theoretical
       relation and data. Theoretical curve is plotted with dashed, 
@@ -31,32 +30,31 @@ def plot_tss_vs_A(tss, A, L, N, u, rhobar):
      'u' - Vector of wind speed in m/s in each image (m/s) 
      'rhobar' - Plume density at height and temperature of the plume 
         at neutral buoyancy, Eqn. (4) in April 2013 paper
+     'filename' - If given, the plot is saved to this file and closed,
+        rather than shown
+     'npoints' - Number of times at which the theoretical curves are
+        calculated
 
 	Output:
 	 plot of Time vs. Area 
     """
 
-    # Define the theoretical time to plot, in seconds
-    theor_time = np.arange(0.7*tss[1],1.5*tss[len(tss)-1])
+    # Define the theoretical time to plot, in seconds, on a log-spaced
+    #  grid, so the cost does not grow with the length of the eruption
+    theor_time = np.logspace(np.log10(0.7*tss[1]), np.log10(1.5*tss[len(tss)-1]), npoints)
 
-    # Pre-allocate space for the theoretical area vectors
-    theor_A_dwp = np.zeros([9,len(theor_time)]) # Downwind plume
-    theor_A_umb = np.zeros([9,len(theor_time)]) # Umbrella cloud
-    l_index = np.zeros(9)
+    # Exponents of the MERs of the theoretical curves, 1e+2 to 1e+10
+    l_index = np.arange(2, 11)
+    MER = (10.**l_index)[:,np.newaxis]
 
-    # Get theoretical curves for time vs. Area 
-    for log_index in range(0, 9):
-        for time_index in range(0, len(theor_time)):
-            # An inverted Eqn. (9) from the unfinished paper, 
-			#  solving for the area given a time
-            l_index[log_index] = log_index + 2
-            theor_A_dwp[log_index,time_index] = 0.00001*(math.sqrt(((10.**(log_index+2.)) * \
-                       8. * L[0] * N[0] * (theor_time[time_index]**3.) * u[0]) / (9.*rhobar[0])))
-            # An inverted Eqn. (6) from the unfinished paper, 
-			#  solving for the area given a time
-            theor_A_umb[log_index,time_index] = 0.00001*((((10.**(log_index+2.)) * 3. * \
-                       math.sqrt(math.pi) * L[0] * N[0] * (theor_time[time_index]**2.)) / (2. * \
-                                rhobar[0]))**(2./3.))
+    # Get theoretical curves for time vs. Area, one MER per row
+    # An inverted Eqn. (9) from the unfinished paper,
+    #  solving for the area given a time (downwind plume)
+    theor_A_dwp = 0.00001*np.sqrt((MER * 8. * L[0] * N[0] * (theor_time**3.) * u[0]) / (9.*rhobar[0]))
+    # An inverted Eqn. (6) from the unfinished paper,
+    #  solving for the area given a time (umbrella cloud)
+    theor_A_umb = 0.00001*(((MER * 3. * np.sqrt(np.pi) * L[0] * N[0] * (theor_time**2.)) / \
+                            (2. * rhobar[0]))**(2./3.))
 
     # Plot theoretical curves / data curves for dwp
     fig = plt.figure()
@@ -76,4 +74,8 @@ def plot_tss_vs_A(tss, A, L, N, u, rhobar):
     plt.loglog(tss, A, linestyle = 'solid', color = 'black')
     plt.loglog(tss, A, "b*")
     plt.legend(loc = 'lower right', ncol = 2, title = 'MER: dash-DW solid-UMB')
-    plt.show()
+    if filename is None:
+        plt.show()
+    else:
+        fig.savefig(filename)
+        plt.close(fig)
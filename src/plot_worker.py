@@ -0,0 +1,80 @@
+"""
+Name: plot_worker
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import multiprocessing		# separate plotting process
+import traceback
+
+
+# The plots that can be asked of the worker, by name
+plot_names = ['plotMER', 'plot_tss_vs_A', 'plot_power_fit']
+
+
+def plot_worker_loop(plots):
+    # Plot in this process with the Agg backend, so no display is needed
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+    from plot_MER import plotMER
+    from plot_tss_vs_A import plot_tss_vs_A
+    from plot_power_fit import plot_power_fit
+    functions = {'plotMER': plotMER, 'plot_tss_vs_A': plot_tss_vs_A,
+                 'plot_power_fit': plot_power_fit}
+
+    while True:
+        item = plots.get()
+        if item is None:
+            break
+        name, args, kwargs = item
+        try:
+            functions[name](*args, **kwargs)
+        except Exception:
+            print "Plot " + name + " failed:"
+            print traceback.format_exc()
+        finally:
+            plt.close('all')
+
+
+class PlotWorker(object):
+    """
+    plotter = PlotWorker(maxsize=16)
+    plotter.plot(name, *args, filename=..., **kwargs)
+    plotter.close()
+
+    Description: Plots figures in a separate process, so that the MER
+     calculation does not wait on matplotlib. The arrays to plot are sent
+     to the worker, which saves each figure to file with the Agg backend;
+     no display is needed. At most 'maxsize' plots wait to be drawn.
+
+    Input:
+     'maxsize' - Number of plots that can wait to be drawn
+
+    Methods:
+     'plot' - Asks for the plot of one of 'plot_names', with the arguments
+        of that function. A 'filename' must be given, since the figure
+        cannot be shown
+     'close' - Waits for the plots asked for to be saved, and stops the
+        worker
+    """
+
+    def __init__(self, maxsize=16):
+        self.plots = multiprocessing.Queue(maxsize)
+        self.process = multiprocessing.Process(target=plot_worker_loop, args=(self.plots,))
+        self.process.daemon = True
+        self.process.start()
+
+    def plot(self, name, *args, **kwargs):
+        if name not in plot_names:
+            raise ValueError('Unknown plot: ' + name)
+        if kwargs.get('filename') is None:
+            raise ValueError('A filename is needed to plot in the worker')
+        self.plots.put((name, args, kwargs))
+
+    def close(self):
+        self.plots.put(None)
+        self.process.join()
@@ -10,25 +10,131 @@ Contact: Marcus Bursik mib@buffalo.edu
 
 import sys
 import numpy as np 						# numpy for array operations
-import matplotlib.pyplot as plt			# use for plotting and figures
 from scipy.optimize import curve_fit	# curve fitting
+from plot_power_fit import plot_power_fit
+from mer_logging import logger
 # import math								# math operations
 
 # How to handle invalid value errors raised by power_func
 np.seterr(invalid = 'ignore')
 
-# Create an error for when the cloudtype changes more than once, 
-#  from umbrella cloud <--> downwind plume
-class CloudtypeError(Exception):
-    sys.exc_clear()
-
 # Function to fit with x, y
 def power_func(x_tss,c,a):
     return (c*x_tss)**a
 
-def power_fit_coeffs(A,tss,cloudtype):
+def power_fit_sums(n, Sw, Sx, Sy, Sxx, Sxy, Syy):
     """
-    [ x_tss, y_A, popt, power_func, c, a ] = power_fit_coeffs(A,tss)
+    [ popt, pcov ] = power_fit_sums(n, Sw, Sx, Sy, Sxx, Sxy, Syy)
+
+    Description: This function fits y = (cx)^a as the straight line
+     log y = a log c + a log x, by weighted linear least squares, from the
+     weighted sums of the logs of the data. The covariance is scaled by
+     the residual variance, as curve_fit does, and carried from the
+     intercept and slope to c and a. The sums can be arrays, to fit many
+     sets of data at once.
+
+    Input:
+     'n' - Number of points
+     'Sw' - Sum of the weights w
+     'Sx', 'Sy' - Sums of w log x and w log y
+     'Sxx', 'Sxy', 'Syy' - Sums of w (log x)^2, w log x log y and w (log y)^2
+
+    Output:
+     'popt' - [c, a], along the last axis
+     'pcov' - The 2 x 2 covariance of c and a, along the last two axes;
+        inf if there are fewer than 3 points
+    """
+    n = np.asarray(n, dtype=float)
+    Dxx = Sxx - Sx*Sx/Sw
+    Dxy = Sxy - Sx*Sy/Sw
+    Dyy = Syy - Sy*Sy/Sw
+
+    # Slope and intercept of the line
+    a = Dxy / Dxx
+    b = (Sy - a*Sx) / Sw
+    c = np.exp(b / a)
+
+    # Covariance of the intercept and slope
+    rss = np.maximum(Dyy - a*Dxy, 0.)
+    dof = n - 2.
+    s2 = np.where(dof > 0, rss / np.where(dof > 0, dof, 1.), np.inf)
+    var_b = s2*Sxx / (Sw*Dxx)
+    var_a = s2 / Dxx
+    cov_ab = -s2*Sx / (Sw*Dxx)
+
+    # Covariance of c = exp(b/a) and a
+    dc_db = c / a
+    dc_da = -c*b / (a*a)
+    var_c = dc_db*dc_db*var_b + 2.*dc_db*dc_da*cov_ab + dc_da*dc_da*var_a
+    cov_ca = dc_db*cov_ab + dc_da*var_a
+
+    # Filled element by element, as np.stack is not in older numpy
+    shape = np.shape(c)
+    popt = np.empty(shape + (2,))
+    popt[..., 0] = c
+    popt[..., 1] = a
+    pcov = np.empty(shape + (2, 2))
+    pcov[..., 0, 0] = var_c
+    pcov[..., 0, 1] = cov_ca
+    pcov[..., 1, 0] = cov_ca
+    pcov[..., 1, 1] = var_a
+    return popt, pcov
+
+def power_fit_loglog(x_tss, y_A, weights=None):
+    """
+    [ popt, pcov ] = power_fit_loglog(x_tss, y_A, weights=None)
+
+    Description: This function fits y = (cx)^a in log space, in a single
+     pass with no iterations, so that it cannot fail to converge. Points
+     where x or y is not positive (such as the first image, at time 0)
+     have no log and are left out. The result can be used in place of
+     that of curve_fit, or to start it.
+
+    Input:
+     'x_tss' - Vector of the seconds since the start of the eruption; or
+        an array, to fit each row separately
+     'y_A' - Vector of the area of the ash cloud in each image
+     'weights' - Weights of the points in the fit of log y; None to weight
+        them all the same
+
+    Output:
+     'popt' - [c, a]
+     'pcov' - The 2 x 2 covariance of c and a
+    """
+    x_tss = np.asarray(x_tss, dtype=float)
+    y_A = np.asarray(y_A, dtype=float)
+    if weights is None:
+        weights = np.ones(np.broadcast(x_tss, y_A).shape)
+    else:
+        weights = np.asarray(weights, dtype=float) * np.ones(np.broadcast(x_tss, y_A).shape)
+
+    # Leave out the points that have no log
+    valid = (x_tss > 0) & (y_A > 0) & (weights > 0)
+    if np.any(np.sum(valid, axis=-1) < 2):
+        raise ValueError('At least 2 points with positive time and area are needed')
+    w = np.where(valid, weights, 0.)
+    lx = np.log(np.where(valid, x_tss, 1.))
+    ly = np.log(np.where(valid, y_A, 1.))
+
+    return power_fit_sums(np.sum(valid, axis=-1), np.sum(w, axis=-1),
+                          np.sum(w*lx, axis=-1), np.sum(w*ly, axis=-1),
+                          np.sum(w*lx*lx, axis=-1), np.sum(w*lx*ly, axis=-1),
+                          np.sum(w*ly*ly, axis=-1))
+
+def fit_power(x_tss, y_A, method='curve_fit'):
+    # Fit y = (cx)^a with the given method; see power_fit_coeffs
+    if method == 'curve_fit':
+        return curve_fit(power_func, x_tss, y_A)
+    elif method == 'loglog':
+        return power_fit_loglog(x_tss, y_A)
+    elif method == 'seeded':
+        popt, pcov = power_fit_loglog(x_tss, y_A)
+        return curve_fit(power_func, x_tss, y_A, p0=popt)
+    raise ValueError("method must be 'curve_fit', 'loglog' or 'seeded'")
+
+def power_fit_coeffs(A,tss,cloudtype,plot=True,filename=None,method='curve_fit',n_breaks=None):
+    """
+    [ x_tss, y_A, power_func, c, a, one_stdev_err ] = power_fit_coeffs(A,tss,cloudtype,plot=True,filename=None,method='curve_fit',n_breaks=None)
 
     Description: This function fits the area and time results to a power 
     law equation, y = cx^a. 'c' and 'a' are estimated. There is the option to 
@@ -40,6 +146,18 @@ def power_fit_coeffs(A,tss,cloudtype):
      'tss' - Vector of number of seconds since the eruption, assuming 
         that the eruption occured at the time that the first image in 
         the file was taken
+     'cloudtype' - Vector of cloudtype in each image, 1 for downwind
+        plume and 2 for umbrella cloud
+     'plot' - If False, nothing is plotted
+     'filename' - If given, the plot is saved to this file and closed,
+        as in plot_power_fit
+     'method' - How the power law is fit: 'curve_fit' for non-linear
+        least squares on the areas, 'loglog' for the linear least squares
+        fit of the logs of power_fit_loglog, which does not iterate, or
+        'seeded' for curve_fit started from the 'loglog' fit
+     'n_breaks' - None to fit the images between each change of cloudtype
+        separately; or the number of changes of power law to find in the
+        data, with find_breakpoints of power_fit_segments
 
     Output:
      'x_tss' - Vector of floats of the seconds since the start of 
@@ -48,8 +166,14 @@ def power_fit_coeffs(A,tss,cloudtype):
 		image, as detected by a previous algorithm (km^2)
      'popt' - Vector of the constant variables found from the regression
      'power_func' - The function with constants to be fit
-     'c' - The constant in y = cx^a
-     'a' - The power constant in y = cx^a
+     'c' - The constant in y = cx^a; a vector, one per fit, if there is
+        more than one fit
+     'a' - The power constant in y = cx^a; a vector if more than one fit
+     'one_stdev_err' - The one standard deviation errors of c and a; one
+        row per fit if more than one fit. A single fit gives 100 times the
+        errors, as this function always has, and more than one fit gives
+        the errors themselves, with every method; get_probabilities
+        writes them as given
 	  
 	 -- plot of fit and data is also an output figure -- 
     """
@@ -62,100 +186,66 @@ def power_fit_coeffs(A,tss,cloudtype):
     x_tss = np.array(x_tss, dtype=float)
     y_A = np.array(y_A, dtype=float)
 
-    # Create an empty list for cloud change indices, that will be appended
-	#  to if the cloudtype changes
-
-    cloud_change = []
-    
-    for idx in range(0,len(cloudtype)):
-        if idx == 0:
-            continue
-        else:
-            if cloudtype[idx] - cloudtype[idx-1] != 0:
-                cloud_change.append(idx)
-            else:
-                continue
+    # Find the indices at which the cloudtype changes, or at which the
+	#  power law changes if a number of breaks is given
+    if n_breaks is None:
+        cloud_change = list(np.flatnonzero(np.diff(cloudtype)) + 1)
+    else:
+        from power_fit_segments import find_breakpoints
+        cloud_change = find_breakpoints(x_tss, y_A, n_breaks)
 
-	print 'cloud_change', cloud_change
+    logger.debug('cloud_change %s', cloud_change)
 
 	# If the length of the cloud_change list is 0, the cloudtype 
 	#  did not change, so fit the data with one best fit power law equation
     if len(cloud_change) == 0:
-        popt, pcov = curve_fit(power_func, x_tss, y_A)
+        popt, pcov = fit_power(x_tss, y_A, method)
         c = popt[0]
         a = popt[1]
         one_stdev_err = 100.*np.sqrt(np.diag(pcov))
 
-	# Otherwise if the length of the cloud_change list is 1, there was one
-	#  change in cloudtype. This is physical, and will create two fits
+	# Otherwise the cloudtype changed, and each run of images between
+	#  changes gets a fit of its own
     else:
-		# Pre-allocate space
-        c = np.ones(2)
-        a = np.ones(2)
-        one_stdev_err = np.ones([2,2])
-        
-		# Fit the data with two best fit equations
-        for idx in range(len(cloud_change)):
-            if idx == 0:
-                x_tss1 = x_tss[0:cloud_change[idx]]
-                y_A1 = y_A[0:cloud_change[idx]]
-                try:
-                    popt1, pcov1 = curve_fit(power_func, x_tss1, y_A1)
-                    c[0] = popt1[0]
-                    a[0] = popt1[1]
-                    one_stdev_err[0,:] = np.sqrt(np.diag(pcov1))
-                except:
-                    e = sys.exc_info()[0]
-                    print "Error: %s" % e
+        bounds = [0] + cloud_change + [len(x_tss)]
+
+        if method == 'loglog':
+            # Fit all the runs at once
+            from power_fit_segments import fit_segments
+            popt, pcov = fit_segments(x_tss, y_A, cloud_change)
+            c = popt[:,0]
+            a = popt[:,1]
+            one_stdev_err = np.sqrt(np.diagonal(pcov, axis1=1, axis2=2))
+
+            # Runs that could not be fit get the same values as failed
+            #  fits of the other methods
+            valid = (x_tss > 0) & (y_A > 0)
+            for idx in range(len(bounds) - 1):
+                n_valid = np.sum(valid[bounds[idx]:bounds[idx+1]])
+                if n_valid < 2 or not np.all(np.isfinite(popt[idx])):
+                    logger.warning("Error: images %d to %d have %d points with positive time and area, too few to fit",
+                                   bounds[idx], bounds[idx+1] - 1, n_valid)
+                    c[idx] = 1.
+                    a[idx] = 1.
+                    one_stdev_err[idx,:] = 1.
+        else:
+            # Pre-allocate space
+            c = np.ones(len(bounds) - 1)
+            a = np.ones(len(bounds) - 1)
+            one_stdev_err = np.ones([len(bounds) - 1,2])
 
-                x_tss2 = x_tss[-(len(cloud_change)-cloud_change[idx]-1):]
-                y_A2 = y_A[-(len(cloud_change)-cloud_change[idx]-1):]
+            for idx in range(len(bounds) - 1):
                 try:
-                    popt2, pcov2 = curve_fit(power_func, x_tss2, y_A2)
-                    c[1] = popt2[0]
-                    a[1] = popt2[1]
-                    one_stdev_err[1,:] = np.sqrt(np.diag(pcov2))
+                    popt, pcov = fit_power(x_tss[bounds[idx]:bounds[idx+1]], y_A[bounds[idx]:bounds[idx+1]], method)
+                    c[idx] = popt[0]
+                    a[idx] = popt[1]
+                    one_stdev_err[idx,:] = np.sqrt(np.diag(pcov))
                 except:
                     e = sys.exc_info()[0]
-                    print "Error: %s" % e
+                    logger.warning("Error: %s", e)
 
     # Now plot!
-
-    plt.loglog(x_tss, y_A, 'b*', label="Data")
-    strformat = 'a: {0:.3f}'
-    fmt = '{0:.2f}'
-
-	# If the length of the cloud_change list is 0, the cloudtype 
-	#  did not change, so plot the fitted function, when only one 
-	#  fit was needed
-    if len(cloud_change) == 0:
-        plt.loglog(x_tss, power_func(x_tss, *popt), label=strformat.format(a))
-
-	# Otherwise if the length of the cloud_change list is 1, there was one
-	#  change in cloudtype. This is possible, and we will plot two fits 
-    else:
-        # Plot the first best fit function
-        plt.loglog(x_tss1, power_func(x_tss1, *popt1), label=strformat.format(a[0]))
-
-        # Plot the second best fit function.  Temporarily disabled, until figure
-        # out how to handle decreasing area 6 Feb 2018
-        # plt.plot(x_tss2, power_func(x_tss2, *popt2), label=strformat.format(a[1]))
-            
-
-    plt.xlabel('Time (s)')
-    plt.ylabel('Area (m^2)')
-    plt.legend(loc = 'lower right', title = 'area=c*time^a')
-    plt.title('Time vs. Area with Fitted Power Curve')
+    if plot:
+        plot_power_fit(x_tss, y_A, c, a, cloud_change, filename=filename)
 
     return x_tss, y_A, power_func, c, a, one_stdev_err
-
-    # Finally, if there was > 1 cloud change, let the operator know.	
-    # If there is more than one index in the cloud_change list, this means
-	#  that the cloudtype changed more than one time, which is not 
-	#  physical. If this is the case, an error is raised
-    if len(cloud_change) > 1:
-        raise CloudtypeError("The ash cloud in the images indicates more\
-		  than one change of cloudtype from umbrella cloud <--> downwind\
- 		  plume. Physically, only one type of change, if any,\
-		  is expected: from umbrella cloud --> downwind plume.")
-
@@ -0,0 +1,153 @@
+"""
+Name: power_fit_segments
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np 						# numpy for array operations
+from power_fit_coeffs import power_fit_sums
+
+def get_prefix_sums(x_tss, y_A, weights=None):
+    """
+    prefix = get_prefix_sums(x_tss, y_A, weights=None)
+
+    Description: This function gets the running sums of the terms of the
+     log-log least squares fit of y = (cx)^a, so that the sums over any
+     run of images, and so the fit of that run, take one subtraction.
+     Images where x or y is not positive have no log and are left out.
+
+    Input:
+     'x_tss' - Vector of the seconds since the start of the eruption
+     'y_A' - Vector of the area of the ash cloud in each image
+     'weights' - Weights of the images in the fit of log y; None to weight
+        them all the same
+
+    Output:
+     'prefix' - A 7 x (n+1) array; column j holds the sums over the first
+        j images of: 1, w, w log x, w log y, w (log x)^2, w log x log y
+        and w (log y)^2, as taken by power_fit_sums
+    """
+    x_tss = np.asarray(x_tss, dtype=float)
+    y_A = np.asarray(y_A, dtype=float)
+    if weights is None:
+        weights = np.ones(len(x_tss))
+    weights = np.asarray(weights, dtype=float)
+
+    valid = (x_tss > 0) & (y_A > 0) & (weights > 0)
+    w = np.where(valid, weights, 0.)
+    lx = np.log(np.where(valid, x_tss, 1.))
+    ly = np.log(np.where(valid, y_A, 1.))
+
+    terms = np.vstack([valid.astype(float), w, w*lx, w*ly, w*lx*lx, w*lx*ly, w*ly*ly])
+    prefix = np.zeros((7, len(x_tss) + 1))
+    prefix[:,1:] = np.cumsum(terms, axis=1)
+    return prefix
+
+def segment_cost(prefix, start, stop, min_size=3):
+    """
+    cost = segment_cost(prefix, start, stop, min_size=3)
+
+    Description: This function gets the residual sum of squares of the
+     log-log fit of the images start to stop - 1, from the running sums.
+     'start' and 'stop' can be arrays, for the costs of many segments at
+     once.
+
+    Input:
+     'prefix' - The running sums of get_prefix_sums
+     'start' - Index of the first image of the segment
+     'stop' - Index one past the last image of the segment
+     'min_size' - Fewest images with a log a segment may have
+
+    Output:
+     'cost' - The residual sum of squares; inf for segments that are too
+        short, or whose times are all the same
+    """
+    start, stop = np.broadcast_arrays(start, stop)
+    n, Sw, Sx, Sy, Sxx, Sxy, Syy = prefix[:,stop] - prefix[:,start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Dxx = Sxx - Sx*Sx/Sw
+        Dxy = Sxy - Sx*Sy/Sw
+        Dyy = Syy - Sy*Sy/Sw
+        cost = np.maximum(Dyy - Dxy*Dxy/Dxx, 0.)
+    return np.where((n >= min_size) & (Dxx > 0), cost, np.inf)
+
+def find_breakpoints(x_tss, y_A, n_breaks, min_size=3, weights=None):
+    """
+    breaks = find_breakpoints(x_tss, y_A, n_breaks, min_size=3, weights=None)
+
+    Description: This function finds where the power law of the area of
+     the cloud changes, as when the cloud goes from umbrella cloud to
+     downwind plume. The images are split into n_breaks + 1 runs, each
+     with a power law of its own, so that the total residual of the
+     log-log fits is least. This is found exactly by dynamic programming;
+     the cost of every possible run comes from the running sums of
+     get_prefix_sums, so the search takes O(n_breaks n^2) operations.
+     The costs of the runs ending at each image are made in turn, so the
+     memory needed is O(n_breaks n).
+
+    Input:
+     'x_tss' - Vector of the seconds since the start of the eruption
+     'y_A' - Vector of the area of the ash cloud in each image
+     'n_breaks' - Number of changes of power law
+     'min_size' - Fewest images each run may have, at least 2
+     'weights' - Weights of the images in the fits; None for the same
+
+    Output:
+     'breaks' - List of the indices of the first image of each run after
+        the first, in the form of the cloud_change list of power_fit_coeffs
+    """
+    prefix = get_prefix_sums(x_tss, y_A, weights)
+    n = prefix.shape[1] - 1
+
+    # total[k,j] is the least cost of splitting the first j images into
+    #  k + 1 runs, and back[k,j] is where the last of those runs starts
+    bounds = np.arange(n + 1)
+    total = np.empty((n_breaks + 1, n + 1))
+    total[:,0] = np.inf
+    back = np.zeros((n_breaks + 1, n + 1), dtype=int)
+    for j in range(1, n + 1):
+        # Cost of every run start:j
+        cost = segment_cost(prefix, bounds[:j], j, min_size)
+        total[0,j] = cost[0]
+        for k in range(1, n_breaks + 1):
+            candidates = total[k-1,:j] + cost
+            back[k,j] = np.argmin(candidates)
+            total[k,j] = candidates[back[k,j]]
+
+    if not np.isfinite(total[n_breaks,n]):
+        raise ValueError('Too few images for ' + str(n_breaks + 1) + ' runs of ' + str(min_size))
+
+    # Follow the runs back from the last image
+    breaks = []
+    stop = n
+    for k in range(n_breaks, 0, -1):
+        stop = back[k,stop]
+        breaks.insert(0, int(stop))
+    return breaks
+
+def fit_segments(x_tss, y_A, breaks, weights=None):
+    """
+    [ popt, pcov ] = fit_segments(x_tss, y_A, breaks, weights=None)
+
+    Description: This function fits y = (cx)^a in log space to each run
+     of images between the breaks, all at once from the running sums.
+
+    Input:
+     'x_tss' - Vector of the seconds since the start of the eruption
+     'y_A' - Vector of the area of the ash cloud in each image
+     'breaks' - List of the indices of the first image of each run after
+        the first
+     'weights' - Weights of the images in the fits; None for the same
+
+    Output:
+     'popt' - Array of [c, a] of each run (runs x 2)
+     'pcov' - Array of the covariance of c and a of each run (runs x 2 x 2)
+    """
+    prefix = get_prefix_sums(x_tss, y_A, weights)
+    bounds = np.array([0] + list(breaks) + [prefix.shape[1] - 1])
+    sums = prefix[:,bounds[1:]] - prefix[:,bounds[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return power_fit_sums(*sums)
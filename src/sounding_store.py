@@ -0,0 +1,321 @@
+"""
+Name: sounding_store
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+
+from get_info_from_txt import read_info_table
+from get_tss_vectorized import get_epoch_seconds
+from get_rhos import get_rhos
+from get_N import get_N
+
+# Columns of a sounding file, one line per level, in the units of the
+#  input files of get_info_from_txt: station number, time
+#  (YYYYMMDDHHMMSS), height (ft), pressure (hPa), temperature (C) and
+#  wind speed (knots)
+sounding_columns = ['station', 'time', 'height', 'pressure', 'temperature', 'wind']
+
+
+class SoundingStore(object):
+    """
+    store = SoundingStore()
+    store.load(sounding_filename)
+    store.add(station, time, height, pressure, temperature, wind)
+    [ index, valid ] = store.find(station, treal_string, max_age=None)
+    values = store.interpolate(index, height, name)
+    atmosphere = store.get_atmosphere(station, treal_string, Ph, maxPh, Z, max_age=None)
+
+    Description: Holds many radiosonde or NWP vertical profiles, so that
+     the pressure, temperature and wind at the heights of each image can
+     be taken from the profile of its station nearest in time, rather
+     than typed in by hand. The profiles are kept sorted by station and
+     time, so the profile of each image is found by binary search, and
+     the levels of all profiles are kept end to end in single arrays, so
+     all images are interpolated in one call of np.interp, with no loop
+     over images.
+
+    Methods:
+     'load' - Adds every profile of a sounding file, with the columns of
+        sounding_columns and one line of headers
+     'add' - Adds one profile, in SI units (m, Pa, K, m/s)
+     'find' - Gets the index of the profile for each image
+     'interpolate' - Gets 'pressure', 'temperature' or 'wind' of the
+        profiles at the heights
+     'get_atmosphere' - Gets all that is needed for get_rhos and get_N
+
+    Attributes:
+     'stations', 'times' - Station and epoch seconds of each profile, in
+        order of station and then time
+    """
+
+    def __init__(self):
+        # Profiles added since the index was last built
+        self.pending = []
+        self.stations = np.zeros(0, dtype=np.int64)
+        self.times = np.zeros(0, dtype=np.int64)
+        self.levels = dict((name, np.zeros(0)) for name in ['height', 'pressure', 'temperature', 'wind'])
+        self.starts = np.zeros(1, dtype=np.int64)
+        self.span = 1.
+        self.offset_height = np.zeros(0)
+        self.bottom = np.zeros(0)
+        self.top = np.zeros(0)
+
+    def add(self, station, time, height, pressure, temperature, wind):
+        """
+        Adds one profile. 'time' is YYYYMMDDHHMMSS, and the levels are in
+         m, Pa, K and m/s, in any order of height.
+        """
+        epoch, valid = get_epoch_seconds([time])
+        if not valid[0]:
+            raise ValueError('Not a real date: ' + str(time))
+        levels = [np.asarray(v, dtype=float).ravel() for v in (height, pressure, temperature, wind)]
+        self.pending.append((int(station), int(epoch[0]), levels))
+
+    def load(self, sounding_filename, delimeter=None):
+        """
+        Adds every profile of a sounding file. Lines with the same station
+         and time are the levels of one profile. Units are converted as in
+         get_info_from_txt.
+        """
+        treal_string, data_matrix = read_info_table(sounding_filename, delimeter=delimeter)
+        if data_matrix.shape[1] != len(sounding_columns):
+            raise ValueError(sounding_filename + ': soundings must have the columns ' + ' '.join(sounding_columns))
+
+        station = data_matrix[:,0].astype(np.int64)
+        time = data_matrix[:,1].astype(np.int64)
+        height = data_matrix[:,2] * 0.3048              # ft -> m
+        pressure = data_matrix[:,3] * 100.              # hPa -> Pa
+        temperature = data_matrix[:,4] + 273.15         # C -> K
+        wind = data_matrix[:,5] * 514444./1000000.      # knots -> m/s
+
+        # Split the lines into profiles where the station or time changes
+        order = np.lexsort((time, station))
+        station, time = station[order], time[order]
+        bounds = np.flatnonzero((np.diff(station) != 0) | (np.diff(time) != 0)) + 1
+        bounds = np.concatenate([[0], bounds, [len(order)]])
+        for k in range(len(bounds) - 1):
+            rows = order[bounds[k]:bounds[k + 1]]
+            self.add(station[bounds[k]], time[bounds[k]], height[rows], pressure[rows],
+                     temperature[rows], wind[rows])
+
+    def build_index(self):
+        # Merge the pending profiles into the sorted arrays
+        if len(self.pending) == 0:
+            return
+        counts = np.diff(self.starts)
+        profiles = [(self.stations[k], self.times[k],
+                     [self.levels[name][self.starts[k]:self.starts[k + 1]]
+                      for name in ['height', 'pressure', 'temperature', 'wind']])
+                    for k in range(len(counts))]
+        profiles = profiles + self.pending
+        self.pending = []
+
+        # A later profile of the same station and time replaces an earlier
+        keys = dict(((station, time), k) for k, (station, time, levels) in enumerate(profiles))
+        profiles = [profiles[keys[key]] for key in sorted(keys)]
+
+        # Levels of each profile in order of height, end to end
+        heights, pressures, temperatures, winds = [], [], [], []
+        for station, time, (height, pressure, temperature, wind) in profiles:
+            order = np.argsort(height)
+            heights.append(height[order])
+            pressures.append(pressure[order])
+            temperatures.append(temperature[order])
+            winds.append(wind[order])
+        self.stations = np.array([p[0] for p in profiles], dtype=np.int64)
+        self.times = np.array([p[1] for p in profiles], dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum([len(h) for h in heights])]).astype(np.int64)
+        self.levels = {'height': np.concatenate(heights), 'pressure': np.concatenate(pressures),
+                       'temperature': np.concatenate(temperatures), 'wind': np.concatenate(winds)}
+
+        # The heights of profile k are offset by k times a span greater
+        #  than the heights of any profile, so that the heights of all
+        #  profiles together are in order, and one np.interp can
+        #  interpolate every image in its own profile
+        profile = np.repeat(np.arange(len(heights)), np.diff(self.starts))
+        height = self.levels['height']
+        self.span = 2. * (np.max(np.abs(height)) + 1.)
+        self.offset_height = height + profile * self.span
+        self.bottom = height[self.starts[:-1]]
+        self.top = height[self.starts[1:] - 1]
+
+    def find(self, station, treal_string, max_age=None):
+        """
+        [ index, valid ] = store.find(station, treal_string, max_age=None)
+
+        Gets, for each image, the index of the profile of its station
+         nearest in time, by binary search. 'station' is one station
+         number or one per image, and 'max_age' the greatest difference
+         in time allowed (s). 'valid' is False where there is no such
+         profile; 'index' is then 0.
+        """
+        self.build_index()
+        epoch, valid = get_epoch_seconds(treal_string)
+        station = np.broadcast_arrays(np.asarray(station, dtype=np.int64), epoch)[0]
+        if len(self.times) == 0:
+            return np.zeros(epoch.shape, dtype=np.int64), np.zeros(epoch.shape, dtype=bool)
+
+        # The profiles of each station are the run between its first and
+        #  last, and, within the run, in order of time
+        first = np.searchsorted(self.stations, station, side='left')
+        last = np.searchsorted(self.stations, station, side='right')
+        valid = valid & (last > first)
+        first = np.minimum(first, len(self.times) - 1)
+        last = np.maximum(last - 1, first)
+
+        # Search all the runs at once, with keys of the time since the
+        #  first profile, shifted by the rank of the station times a span
+        #  greater than all the times
+        t_min = self.times.min()
+        shift = self.times.max() - t_min + 1
+        rank = np.cumsum(np.concatenate([[0], np.diff(self.stations) != 0]))
+        keys = rank * shift + (self.times - t_min)
+        image_keys = rank[first] * shift + np.clip(epoch - t_min, 0, shift - 1)
+
+        # The profiles either side of each image, and the nearer of them
+        after = np.clip(np.searchsorted(keys, image_keys, side='left'), first, last)
+        before = np.clip(after - 1, first, last)
+        index = np.where(np.abs(epoch - self.times[before]) <= np.abs(self.times[after] - epoch), before, after)
+
+        if max_age is not None:
+            valid = valid & (np.abs(epoch - self.times[index]) <= max_age)
+        return np.where(valid, index, 0), valid
+
+    def interpolate(self, index, height, name):
+        """
+        values = store.interpolate(index, height, name)
+
+        Interpolates 'pressure', 'temperature' or 'wind' of profile
+         'index' at each height (m). Pressure is interpolated in its log,
+         as it falls off exponentially with height. NaN outside the
+         heights of the profile.
+        """
+        self.build_index()
+        index = np.asarray(index, dtype=np.int64)
+        height = np.asarray(height, dtype=float)
+        if len(self.times) == 0:
+            return np.nan * np.ones(np.broadcast(index, height).shape)
+        values = self.levels[name]
+        if name == 'pressure':
+            values = np.log(values)
+        result = np.interp(height + index * self.span, self.offset_height, values)
+        if name == 'pressure':
+            result = np.exp(result)
+        with np.errstate(invalid='ignore'):
+            inside = (height >= self.bottom[index]) & (height <= self.top[index])
+        return np.where(inside, result, np.nan)
+
+    def get_atmosphere(self, station, treal_string, Ph, maxPh, Z, max_age=None):
+        """
+        atmosphere = store.get_atmosphere(station, treal_string, Ph, maxPh, Z, max_age=None)
+
+        Gets, for each image, from the profile of find, the pressure and
+         temperature at Ph ('P0', 'T0') and maxPh ('Pp', 'Tp'), the wind
+         speed at Z ('u'), and 'valid', as a dictionary of vectors. All
+         values are NaN where 'valid' is False.
+        """
+        index, valid = self.find(station, treal_string, max_age=max_age)
+        atmosphere = {'valid': valid}
+        for key, height, name in [('P0', Ph, 'pressure'), ('T0', Ph, 'temperature'),
+                                  ('Pp', maxPh, 'pressure'), ('Tp', maxPh, 'temperature'),
+                                  ('u', Z, 'wind')]:
+            atmosphere[key] = np.where(valid, self.interpolate(index, height, name), np.nan)
+        return atmosphere
+
+
+def get_rhos_N_from_soundings(store, station, treal_string, Ph, maxPh, Z, max_age=None, Rd=287., g=-9.81,
+                              cp=1004., N_fallback=0.035):
+    """
+    [ rhobar, rhogas, N, u, valid ] = get_rhos_N_from_soundings(store, station, treal_string, Ph, maxPh, Z,
+        max_age=None, Rd=287., g=-9.81, cp=1004., N_fallback=0.035)
+
+    Description: This function calculates the densities of get_rhos and
+     the buoyancy frequency of get_N from sounding profiles rather than
+     from the pressures and temperatures of the input file. At the level
+     of neutral buoyancy and at the top of the cloud, the temperature of
+     the cloud is taken to be that of the atmosphere around it. N is that
+     of the atmosphere between the two heights, from the lapse rate of the
+     profile and the dry adiabatic lapse rate, as get_N with 'cp'.
+
+    Input:
+     'store' - A SoundingStore holding the profiles
+     'station' - Station number, one for all images or one per image
+     'treal_string' - Vector of the time each image was taken
+        (YYYYMMDDHHMMSS)
+     'Ph' - Vector of plume spreading height at the level of neutral
+        buoyancy in each image (m)
+     'maxPh' - Vector of maximum plume height in each image (m)
+     'Z' - Vector of height at which the wind speed is wanted (m)
+     'max_age' - Greatest difference in time between an image and its
+        profile (s); None for any
+     'Rd' - Gas constant for dry air = 287 (J/K/Kg) unless noted otherwise
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+     'cp' - Specific heat of dry air at constant pressure = 1004 (J/K/kg)
+     'N_fallback' - As for get_N, for images where the profile gives no
+        real, positive N; they are not valid
+
+    Output:
+     'rhobar' - Plume density at the neutral buoyancy height (kg/cu m)
+     'rhogas' - The density of the gas at the top of the cloud (kg/cu m)
+     'N' - The buoyancy frequency (1/s)
+     'u' - Wind speed at Z (m/s)
+     'valid' - False for images with no profile, heights outside it, or
+        no real, positive N
+    """
+    atmosphere = store.get_atmosphere(station, treal_string, Ph, maxPh, Z, max_age=max_age)
+    rhobar, rhogas = get_rhos(atmosphere['P0'], atmosphere['Pp'], atmosphere['Tp'], atmosphere['T0'], Rd = Rd)
+    N, N_valid = get_N(atmosphere['T0'], atmosphere['Tp'], Ph, maxPh, g = g, N_fallback = N_fallback,
+                       return_mask = True, cp = cp)
+    valid = atmosphere['valid'] & N_valid & ~np.isnan(rhobar) & ~np.isnan(rhogas) & ~np.isnan(atmosphere['u'])
+    return rhobar, rhogas, N, atmosphere['u'], valid
+
+
+if __name__ == '__main__':
+    # Profiles of the standard atmosphere, warmed or cooled, for 50
+    #  stations twice a day for a month, and 1e5 images among them
+    import time
+    from isa import isa_from_height
+
+    height = np.linspace(0., 20000., 80)
+    temperature, pressure, density = isa_from_height(height)
+    store = SoundingStore()
+    start = time.time()
+    for station in range(1000, 1050):
+        for day in range(1, 31):
+            for hour in [0, 12]:
+                shift = (station - 1025) * 0.1 + hour * 0.05
+                store.add(station, 20171000000000 + day * 1000000 + hour * 10000, height,
+                          pressure, temperature + shift, 10. + 0.001 * height)
+    store.build_index()
+    print len(store.times), ' profiles indexed: ', time.time() - start, ' s'
+
+    n = 100000
+    rng = np.random.RandomState(0)
+    stations = rng.randint(1000, 1050, n)
+    days = rng.randint(1, 31, n)
+    hours = rng.randint(0, 24, n)
+    treal_string = (20171000000000 + days * 1000000 + hours * 10000).astype(str)
+    Ph = rng.uniform(1000., 10000., n)
+    maxPh = Ph + rng.uniform(500., 5000., n)
+    start = time.time()
+    rhobar, rhogas, N, u, valid = get_rhos_N_from_soundings(store, stations, treal_string, Ph, maxPh, Ph)
+    print n, ' images: ', time.time() - start, ' s'
+    print 'N of the profiles (1/s), min - max = ', np.min(N[valid]), ' - ', np.max(N[valid]), \
+        ', images valid: ', np.sum(valid)
+
+    # Each image against its own profile, found and interpolated directly;
+    #  of two profiles as near, find takes the earlier
+    index, found = store.find(stations, treal_string)
+    nearest = np.where(hours <= 6, 0, np.where(hours <= 18, 12, 24))
+    nearest_day = days + nearest // 24
+    nearest_hour = nearest % 24
+    matched = (store.stations[index] == stations) & \
+        (store.times[index] == get_epoch_seconds((20171000000000 + nearest_day * 1000000 + nearest_hour * 10000).astype(str))[0])
+    print 'images matched to their nearest profile: ', np.sum(matched[nearest_day <= 30]), ' of ', np.sum(nearest_day <= 30)
+    T0 = np.interp(Ph, height, temperature) + (stations - 1025) * 0.1 + nearest_hour * 0.05
+    print 'largest error of temperature at Ph: ', np.max(np.abs(store.interpolate(index, Ph, 'temperature') - T0)[nearest_day <= 30])
@@ -0,0 +1,100 @@
+"""
+Name: sweep_MER
+Version: 0.1
+Date: 18 October 2026
+Author: Rose M. Rustowicz, Solene Pouget, Marcus Bursik
+Concept: Solene Pouget, Emile Jansons, Marcus Bursik
+Contact: Marcus Bursik mib@buffalo.edu
+"""
+
+import numpy as np			# numpy for array operations
+
+from get_N import get_N
+from get_MERs_vectorized import get_MERs_vectorized
+
+
+def sweep_MER(D1, D2, rhobar, tss, A, u, rhogas, Tb, maxT, Ph, maxPh,
+              L_dwp=0.845, L_umb=1., ratio_threshold=3., N_fallback=0.035, grid=True, g=-9.81):
+    """
+    results = sweep_MER(D1, D2, rhobar, tss, A, u, rhogas, Tb, maxT, Ph, maxPh,
+        L_dwp=0.845, L_umb=1., ratio_threshold=3., N_fallback=0.035, grid=True, g=-9.81)
+
+    Description: This function computes the MER and mass of one eruption
+     for many choices of the constants of the model at once, to see how
+     sensitive the results are to them. Each constant can be a single
+     value or a list of values. The scenarios are all the combinations of
+     the values (grid = True), or the values taken together in order
+     (grid = False, with lists of the same length). Every scenario is
+     computed in one call of get_MERs_vectorized, as a row of 2-D arrays.
+
+    Input:
+     'D1', 'D2', 'rhobar', 'tss', 'A', 'u', 'rhogas' - Vectors of the
+        image data, as for get_MERs_cloudtype
+     'Tb', 'maxT', 'Ph', 'maxPh' - Vectors of the temperatures (K) and
+        heights (m) from which get_N calculates the buoyancy frequency
+     'L_dwp' - Lambda of a downwind plume
+     'L_umb' - Lambda of an umbrella cloud
+     'ratio_threshold' - Diameter ratio above which the cloud is a
+        downwind plume
+     'N_fallback' - Buoyancy frequency where get_N cannot calculate it
+     'grid' - True for every combination of the values, False to take
+        the values together
+     'g' - Constant of gravity = -9.81 (m/(s^2)) unless noted otherwise
+
+    Output:
+     'results' - A dictionary of, for each scenario: its 'L_dwp', 'L_umb',
+        'ratio_threshold' and 'N_fallback'; the 'total_mass' (kg),
+        'duration' (s) and 'mean_MERp' (kg/s), as in the summary of
+        get_MERs_cloudtype; and 'MERpa', 'mass' and 'cloudtype' for each
+        image (scenarios x images)
+    """
+    names = ['L_dwp', 'L_umb', 'ratio_threshold', 'N_fallback']
+    values = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (L_dwp, L_umb, ratio_threshold, N_fallback)]
+    if grid:
+        values = [v.ravel() for v in np.meshgrid(*values, indexing='ij')]
+    else:
+        values = np.broadcast_arrays(*values)
+    results = dict(zip(names, values))
+
+    # Buoyancy frequency, with the fallback of each scenario where get_N
+    #  cannot calculate it
+    N, valid = get_N(Tb, maxT, Ph, maxPh, g = g, return_mask = True)
+    N = np.where(valid, N, results['N_fallback'][:,np.newaxis])
+
+    # All the scenarios at once, one per row
+    L, MERpl, MERpli, MERpa, MERpai, cloudtype, mass = get_MERs_vectorized(
+        D1, D2, rhobar, tss, A, N, u, rhogas,
+        L_dwp=results['L_dwp'][:,np.newaxis], L_umb=results['L_umb'][:,np.newaxis],
+        ratio_threshold=results['ratio_threshold'][:,np.newaxis])
+
+    results['MERpa'] = MERpa
+    results['mass'] = mass
+    results['cloudtype'] = cloudtype
+    results['total_mass'] = np.max(mass, axis=1)
+    results['duration'] = np.asarray(tss, dtype=float)[np.argmax(mass, axis=1)]
+    with np.errstate(invalid='ignore'):
+        results['mean_MERp'] = np.nanmean(MERpa[:,1:], axis=1)
+
+    return results
+
+
+if __name__ == '__main__':
+    # Sweep the constants for the Tinakula test data
+    import os
+    import time
+    from get_info_from_txt import get_info_from_txt
+    from get_tss_vectorized import get_tss_vectorized
+
+    path = os.getcwd()
+    [ treal_string, treal, A, D1, D2, Ph, Tb, P0, maxPh, maxT, Pp, Z, uk, u] = \
+        get_info_from_txt(path[:-4] + '/test/' + 'test_tinakula_1_ftc.ssv', delimeter=' ')
+    tss = get_tss_vectorized(treal_string, 'None')
+    rhobar = P0 / (Tb * 287.)
+    rhogas = Pp / (maxT * 287.)
+
+    start = time.time()
+    results = sweep_MER(D1, D2, rhobar, tss, A, u, rhogas, Tb, maxT, Ph, maxPh,
+                        L_dwp=np.linspace(0.6, 1.0, 10), L_umb=np.linspace(0.2, 1.2, 10),
+                        ratio_threshold=np.linspace(2., 4., 10), N_fallback=np.linspace(0.01, 0.05, 5))
+    print len(results['total_mass']), ' scenarios: ', time.time() - start, ' s'
+    print "Tot. mass ash, min - max = ", np.min(results['total_mass']), " - ", np.max(results['total_mass']), " kg"